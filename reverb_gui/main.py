@@ -3,9 +3,7 @@
 import sys
 from typing import NoReturn
 
-from PySide6.QtWidgets import QApplication
-
-# Import MainWindow AFTER checking models, to avoid Qt imports if exit needed
+# Import Qt and MainWindow AFTER checking models, to avoid Qt imports if exit needed
 # from .gui.mainwindow import MainWindow # Deferred import
 from .utils.model_downloader import ensure_models_are_downloaded
 
@@ -28,7 +26,9 @@ def launch_gui() -> NoReturn:
         print(f"Models verified/downloaded successfully in: {models_dir}")
 
     # 2. Initialize and launch the GUI only if models are ready
-    # Import MainWindow now that we know we can proceed
+    # Import Qt and MainWindow now that we know we can proceed
+    from PySide6.QtWidgets import QApplication
+
     from .gui.mainwindow import MainWindow
 
     app = QApplication(sys.argv)
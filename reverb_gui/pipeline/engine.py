@@ -4,13 +4,14 @@ import sys
 import time
 import traceback
 import tempfile
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple, Dict, Any
 from collections import defaultdict
 
 # --- Model & Pipeline Imports ---
+import numpy as np
 import torch
-from intervaltree import Interval, IntervalTree
 # Assume 'wenet' module is available via PYTHONPATH or similar mechanism
 # We need the ReverbASR class and its loader
 # from asr.wenet.cli.reverb import ReverbASR, load_model as load_asr_model
@@ -106,58 +107,102 @@ def _load_models_if_needed(models_dir: Path) -> None:
         raise RuntimeError(f"Failed to load models: {e}") from e
 
 
+@dataclass(frozen=True)
+class _SpeakerIndex:
+    """Sorted array view of diarization segments for fast word -> speaker lookup.
+
+    Attributes:
+        bounds: Interleaved segment boundaries ``[s0, e0, s1, e1, ...]``, sorted by start.
+        labels: Index into ``label_names`` for each segment.
+        label_names: Speaker labels in order of first appearance.
+        max_ends: Running maximum of the segment ends. Unlike the ends themselves this
+                  stays monotonic when different speakers overlap, so it can be searched.
+        max_end_owner: Index of the segment that produced each ``max_ends`` entry.
+    """
+    bounds: np.ndarray
+    labels: np.ndarray
+    label_names: List[str]
+    max_ends: np.ndarray
+    max_end_owner: np.ndarray
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Tuple[float, float, str]]) -> "_SpeakerIndex":
+        """Builds the index from (start, end, speaker_label) triples.
+
+        Overlapping segments of the same speaker are coalesced; empty segments are dropped.
+        """
+        by_label: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+        for start, end, label in segments:
+            if end > start:
+                by_label[label].append((float(start), float(end)))
+
+        rows: List[Tuple[float, float, int]] = []
+        label_names = list(by_label)
+        for label_idx, label in enumerate(label_names):
+            merged: List[List[float]] = []
+            for start, end in sorted(by_label[label]):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            rows.extend((start, end, label_idx) for start, end in merged)
+        rows.sort(key=lambda row: row[0])
+
+        bounds = np.array([bound for row in rows for bound in row[:2]], dtype=np.float64)
+        labels = np.array([row[2] for row in rows], dtype=np.int32)
+        ends = bounds[1::2]
+        max_ends = np.maximum.accumulate(ends) if len(ends) else ends
+        positions = np.arange(len(ends))
+        max_end_owner = np.maximum.accumulate(np.where(ends == max_ends, positions, 0)) if len(ends) else positions
+        return cls(bounds, labels, label_names, max_ends, max_end_owner)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
 # Helper function adapted from assign_words2speakers.py
 def speaker_for_word(start_time: float,
                      duration: float,
-                     tree: IntervalTree) -> str:
-    """Given a word's start and duration in seconds, and an interval tree representing
+                     index: _SpeakerIndex) -> str:
+    """Given a word's start and duration in seconds, and an index of
     speaker segments, return the speaker label.
 
     If there are overlapping speakers, return the speaker who spoke most of the
     time. If there are no speakers, return the nearest one.
     """
-    intervals = tree[start_time : start_time + duration]
-
-    # Easy case, only one possible interval
-    if len(intervals) == 1:
-        return intervals.pop().data
-
-    # First special case, no match
-    # so we need to find the nearest interval
-    elif len(intervals) == 0:
-        seg = Interval(start_time, start_time + duration)
-        distances = {interval: seg.distance_to(interval)
-                     for interval in tree}
-        if not distances:
-            return "UNKNOWN" # Handle case with no speaker segments at all
-        nearest_interval = min(distances, key=distances.get)
-        # Optional: Add a distance threshold? If nearest is too far, return UNKNOWN?
-        # distance_threshold = 1.0 # seconds
-        # if distances[nearest_interval] > distance_threshold:
-        #    return "UNKNOWN_FAR"
-        return nearest_interval.data
-
-    # Second special case, overlapping speakers
-    # so we return whichever speaker has majority
-    else:
-        seg = Interval(start_time, start_time + duration)
-        overlap_sizes = defaultdict(float) # Use float for precision
-        for interval in intervals:
-            i0 = max(seg.begin, interval.begin)
-            i1 = min(seg.end, interval.end)
-            overlap = i1 - i0
-            if overlap > 0: # Ensure there is actual overlap
-                 overlap_sizes[interval.data] += overlap
-        if not overlap_sizes:
-             # This can happen if the word interval is entirely within a gap
-             # between speaker segments. Fallback to nearest.
-             # TODO: Maybe log this case?
-             distances = {interval: seg.distance_to(interval)
-                         for interval in tree}
-             if not distances:
-                 return "UNKNOWN_GAP"
-             return min(distances, key=distances.get).data
-        return max(overlap_sizes, key=overlap_sizes.get)
+    if len(index) == 0:
+        return "UNKNOWN" # Handle case with no speaker segments at all
+
+    end_time = start_time + duration
+    starts = index.bounds[::2]
+    ends = index.bounds[1::2]
+
+    # Candidates start before the word ends ([0, lo)) and, judging by the running
+    # maximum of the ends, may still be active when the word starts ([hi, lo)).
+    lo = int(np.searchsorted(starts, end_time, side='left'))
+    hi = int(np.searchsorted(index.max_ends, start_time, side='right'))
+
+    # Overlapping speakers: return whichever speaker has majority
+    overlap_sizes: Dict[int, float] = {}
+    for i in range(hi, lo):
+        overlap = min(end_time, ends[i]) - max(start_time, starts[i])
+        if overlap > 0: # Ensure there is actual overlap
+            label_idx = int(index.labels[i])
+            overlap_sizes[label_idx] = overlap_sizes.get(label_idx, 0.0) + overlap
+    if overlap_sizes:
+        return index.label_names[max(overlap_sizes, key=overlap_sizes.get)]
+
+    # No match, so find the nearest segment: the one ending last before
+    # the word, or the first one starting after it.
+    nearest_idx = -1
+    nearest_distance = float('inf')
+    if lo > 0:
+        nearest_idx = int(index.max_end_owner[lo - 1])
+        nearest_distance = max(0.0, start_time - index.max_ends[lo - 1])
+    if lo < len(index) and starts[lo] - end_time <= nearest_distance: # Ties go to the following segment
+        nearest_idx = lo
+    # Optional: Add a distance threshold? If nearest is too far, return UNKNOWN?
+    return index.label_names[int(index.labels[nearest_idx])]
 
 
 def transcribe(
@@ -209,16 +254,17 @@ def transcribe(
         diar_end = time.time()
         print(f"Engine: Diarization took {diar_end - diar_start:.2f}s.")
 
-        # --- Build Speaker Interval Tree ---
-        speaker_tree = IntervalTree()
+        # --- Build Speaker Index ---
+        speaker_segments: List[Tuple[float, float, str]] = []
         if diarization_result:
-            # Convert pyannote.core.Annotation to IntervalTree
+            # Convert pyannote.core.Annotation to (start, end, label) triples
             # Assuming diarization_result.itertracks yields (segment, track_id, speaker_label)
             for segment, _, speaker_label in diarization_result.itertracks(yield_label=True):
-                speaker_tree.add(Interval(segment.start, segment.end, speaker_label))
+                speaker_segments.append((segment.start, segment.end, speaker_label))
         else:
              print("Warning: Diarization returned no segments.")
              # Assign all words to UNKNOWN if no diarization? Or handle differently?
+        speaker_index = _SpeakerIndex.from_segments(speaker_segments)
 
         # 3. Run ASR (Wenet) - Requesting CTM format
         print(f"Engine: Running ASR on {wav_path.name}...")
@@ -260,7 +306,7 @@ def transcribe(
                         end_time = start_time + duration
 
                         # Find speaker for this word's time interval
-                        speaker_label = speaker_for_word(start_time, duration, speaker_tree)
+                        speaker_label = speaker_for_word(start_time, duration, speaker_index)
 
                         combined_transcript.append((start_time, end_time, speaker_label, word_text))
                     except ValueError as e:
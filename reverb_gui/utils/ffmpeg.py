@@ -1,36 +1,174 @@
 """Utilities for interacting with the FFmpeg executable."""
 
+import functools
 import shutil
 import subprocess
 import pathlib
 import tempfile
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple, Union
 import shlex # Import shlex
 from .path_parser import parse_env_path # Import the new parser
 
-# Read FFmpeg command path from environment variable, default to 'ffmpeg'
-raw_ffmpeg_path = os.getenv("FFMPEG_PATH")
-parsed_path = parse_env_path(raw_ffmpeg_path)
+def _resolve_ffmpeg_cmd(env_value: Optional[str]) -> str:
+    """Resolves the FFmpeg command from a raw FFMPEG_PATH value.
 
-if parsed_path:
-    # Use the string representation of the parsed path
-    FFMPEG_CMD = str(parsed_path)
-else:
+    Returns the normalized path (quotes stripped) if one is given, else 'ffmpeg'.
+    """
+    parsed_path = parse_env_path(env_value)
+    if parsed_path:
+        # Use the string representation of the parsed path
+        return str(parsed_path)
     # Default if env var is not set or empty, or parsing failed
-    FFMPEG_CMD = "ffmpeg"
+    return "ffmpeg"
+
+# Read FFmpeg command path from environment variable, default to 'ffmpeg'
+FFMPEG_CMD = _resolve_ffmpeg_cmd(os.getenv("FFMPEG_PATH"))
+
+# Supported output bit depths and their signed little-endian PCM codecs
+_BIT_DEPTH_CODEC = {16: "pcm_s16le", 24: "pcm_s24le", 32: "pcm_s32le"}
+_SUPPORTED_BIT_DEPTHS = ", ".join(str(d) for d in sorted(_BIT_DEPTH_CODEC)[:-1]) + f", or {max(_BIT_DEPTH_CODEC)}"
+
+# Read size for streamed PCM output (~1 s of 16 kHz 16-bit mono audio)
+PCM_CHUNK_BYTES = 32_000
+
+def _pcm_codec(bit_depth: int) -> str:
+    """Returns the FFmpeg PCM codec for bit_depth, raising ValueError if unsupported."""
+    try:
+        return _BIT_DEPTH_CODEC[bit_depth]
+    except KeyError:
+        raise ValueError(f"Unsupported bit depth: {bit_depth}. Must be {_SUPPORTED_BIT_DEPTHS}.") from None
+
+# Set once FFmpeg has been found; a failed check is never cached
+_FFMPEG_AVAILABLE = False
 
 def check_ffmpeg_availability() -> bool:
-    """Checks if the ffmpeg command is available and executable."""
+    """Checks if the ffmpeg command is available and executable.
+
+    A successful check is remembered for the life of the process (FFMPEG_CMD
+    does not change). A failed one is repeated on every call, so installing
+    FFmpeg or fixing PATH takes effect without restarting the app.
+    """
+    global _FFMPEG_AVAILABLE
+    if _FFMPEG_AVAILABLE:
+        return True
+
+    # Fast path: an absolute FFMPEG_PATH pointing at an executable needs no PATH search
+    if os.path.isabs(FFMPEG_CMD) and os.path.isfile(FFMPEG_CMD) and os.access(FFMPEG_CMD, os.X_OK):
+        print(f"FFmpeg found at: {FFMPEG_CMD}")
+        _FFMPEG_AVAILABLE = True
+        return True
+
+    # Otherwise let shutil.which search PATH (and apply PATHEXT on Windows)
     cmd_path = shutil.which(FFMPEG_CMD)
     if cmd_path:
         print(f"FFmpeg found at: {cmd_path}")
+        _FFMPEG_AVAILABLE = True
         return True
     else:
         print(f"Error: Command '{FFMPEG_CMD}' not found using shutil.which.")
         print("Please ensure the path is correct in FFMPEG_PATH (if set) or that 'ffmpeg' is in your system's PATH.")
         return False
 
+@functools.lru_cache(maxsize=None)
+def _wav_output_args(sample_rate: int, bit_depth: int, channels: int) -> Tuple[str, ...]:
+    """Returns the FFmpeg flags between input and output for a WAV conversion.
+
+    Built once per (sample_rate, bit_depth, channels) and reused as a tuple.
+    """
+    # -vn: disable video recording
+    # -acodec: audio codec (pcm_s16le for 16-bit PCM)
+    # -ar: audio sample rate
+    # -ac: audio channels
+    # -y: overwrite output files without asking
+    # -loglevel error: Only show errors
+    return (
+        '-vn',
+        '-acodec', _pcm_codec(bit_depth),
+        '-ar', str(sample_rate),
+        '-ac', str(channels),
+        '-y',
+        '-loglevel', 'error', # Keep output clean unless error
+    )
+
+# Output flags for the default conversion (16 kHz, 16-bit, mono), frozen at import
+FFMPEG_BASE_ARGS_16K_S16_MONO: Tuple[str, ...] = _wav_output_args(16000, 16, 1)
+
+def _resolve_output_dir(output_dir: Optional[pathlib.Path]) -> str:
+    """Returns the directory for converted files as a string, creating it if needed.
+
+    If output_dir is None, a new system temporary directory is used.
+    """
+    if output_dir is None:
+        # Use a temporary directory that gets cleaned up automatically
+        # Note: We need to manage the lifecycle or pass the directory handle out
+        # For simplicity now, let's create a named temporary file directly.
+        # Using a directory might be better if FFmpeg needs intermediate files.
+        temp_dir = tempfile.mkdtemp(prefix="reverb_gui_ffmpeg_")
+        print(f"Using temporary directory: {temp_dir}")
+        return temp_dir
+    output_dir_str = os.fspath(output_dir)
+    os.makedirs(output_dir_str, exist_ok=True)
+    return output_dir_str
+
+def _converted_wav_name(input_path: pathlib.Path, sample_rate: int, bit_depth: int) -> str:
+    """Builds the output WAV filename for a converted input file."""
+    return f"{input_path.stem}_converted_{sample_rate}hz_{bit_depth}bit_mono.wav"
+
+def _check_distinct_output_names(
+    input_paths: List[pathlib.Path],
+    sample_rate: int,
+    bit_depth: int
+) -> List[str]:
+    """Returns the output WAV filenames, raising ValueError if any would collide."""
+    output_filenames = [_converted_wav_name(p, sample_rate, bit_depth) for p in input_paths]
+    if len(set(output_filenames)) != len(output_filenames):
+        raise ValueError("Input files must have distinct names; converted outputs would overwrite each other.")
+    return output_filenames
+
+def _run_ffmpeg(
+    command: List[str],
+    source: str,
+    stdout: int = subprocess.DEVNULL,
+    text: bool = True
+) -> subprocess.CompletedProcess:
+    """Runs an FFmpeg command, translating failures into RuntimeError/FileNotFoundError.
+
+    Only stderr is buffered by default; stdout is discarded since conversions
+    write to a file. Pass stdout=subprocess.PIPE when the output is piped.
+
+    Args:
+        command: Full FFmpeg argv (first element is FFMPEG_CMD).
+        source: Description of the input(s), used in error messages.
+        stdout: Where FFmpeg's stdout goes (default: subprocess.DEVNULL).
+        text: Decode stdout/stderr as text (False to capture raw bytes).
+
+    Returns:
+        The completed process, with captured stdout/stderr.
+    """
+    try:
+        result = subprocess.run(command, check=True, stdout=stdout, stderr=subprocess.PIPE, text=text, shell=False)
+        # print(f"DEBUG: FFmpeg stdout:\n{result.stdout}") # Often empty with -loglevel error
+        # print(f"DEBUG: FFmpeg stderr:\n{result.stderr}") # Can contain info even on success
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+        print("FFmpeg conversion failed with CalledProcessError!")
+        print(f"Command executed: {' '.join(shlex.quote(c) for c in command)}") # Use shlex.quote for safe display
+        print(f"Return code: {e.returncode}")
+        print(f"Stderr:\n{stderr}")
+        raise RuntimeError(f"FFmpeg conversion failed for {source}. Command: '{FFMPEG_CMD}'. Error: {stderr}") from e
+    except FileNotFoundError as e:
+        print(f"Error executing FFmpeg command (FileNotFoundError): {e}")
+        raise FileNotFoundError(f"Failed to execute command '{FFMPEG_CMD}'. Is it a valid executable and accessible? Original error: {e}") from e
+    return result
+
+def _check_wav_output(output_wav_path: str) -> None:
+    """Raises RuntimeError if FFmpeg did not produce a non-empty output file."""
+    # Check if the output file was actually created (belt-and-suspenders)
+    if not os.path.isfile(output_wav_path) or os.path.getsize(output_wav_path) == 0:
+        raise RuntimeError(f"FFmpeg conversion failed to produce output file: {output_wav_path}")
+
 def convert_to_wav(
     input_path: pathlib.Path,
     output_dir: Optional[pathlib.Path] = None,
@@ -62,68 +200,258 @@ def convert_to_wav(
     if not input_path.is_file():
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
-    if bit_depth not in [16, 24, 32]: # Common PCM bit depths
-         raise ValueError(f"Unsupported bit depth: {bit_depth}. Must be 16, 24, or 32.")
-    pcm_codec = f"pcm_s{bit_depth}le" # e.g., pcm_s16le
+    _pcm_codec(bit_depth) # Validate bit depth before touching the filesystem
 
     # Create output directory if needed
-    if output_dir is None:
-        # Use a temporary directory that gets cleaned up automatically
-        # Note: We need to manage the lifecycle or pass the directory handle out
-        # For simplicity now, let's create a named temporary file directly.
-        # Using a directory might be better if FFmpeg needs intermediate files.
-        temp_dir = tempfile.mkdtemp(prefix="reverb_gui_ffmpeg_")
-        output_dir_path = pathlib.Path(temp_dir)
-        print(f"Using temporary directory: {output_dir_path}")
-    else:
-        output_dir_path = pathlib.Path(output_dir)
-        output_dir_path.mkdir(parents=True, exist_ok=True)
+    output_dir_str = _resolve_output_dir(output_dir)
 
-    # Construct output path (ensure unique name to avoid collisions)
-    output_filename = f"{input_path.stem}_converted_{sample_rate}hz_{bit_depth}bit_mono.wav"
-    output_wav_path = output_dir_path / output_filename
+    # Construct output path as a plain string (ensure unique name to avoid collisions);
+    # it only becomes a Path at the return boundary
+    output_wav_str = os.path.join(output_dir_str, _converted_wav_name(input_path, sample_rate, bit_depth))
 
-    # Construct FFmpeg command
-    # -i: input file
-    # -vn: disable video recording
-    # -acodec: audio codec (pcm_s16le for 16-bit PCM)
-    # -ar: audio sample rate
-    # -ac: audio channels
-    # -y: overwrite output files without asking
-    # -loglevel error: Only show errors
+    # Construct FFmpeg command from the cached output flags
     command = [
+        FFMPEG_CMD,
+        '-i', os.fspath(input_path),
+        *_wav_output_args(sample_rate, bit_depth, channels),
+        # TODO: Add '-progress pipe:1' for progress reporting later
+        output_wav_str
+    ]
+
+    _run_ffmpeg(command, str(input_path))
+    _check_wav_output(output_wav_str)
+
+    print(f"FFmpeg conversion successful: {output_wav_str}")
+    return pathlib.Path(output_wav_str)
+
+def convert_many_to_wav(
+    input_paths: List[pathlib.Path],
+    output_dir: Optional[pathlib.Path] = None,
+    sample_rate: int = 16000,
+    bit_depth: int = 16,
+    channels: int = 1
+) -> List[pathlib.Path]:
+    """Converts several input files to mono WAV files with a single FFmpeg process.
+
+    Each input gets its own output group in one FFmpeg command, so a batch of
+    N files pays the process startup cost once instead of N times.
+
+    Args:
+        input_paths: Paths to the input files.
+        output_dir: Directory to save the output WAV files. If None, a system
+                    temporary directory is used.
+        sample_rate: Target sample rate in Hz (default: 16000).
+        bit_depth: Target bit depth (default: 16).
+        channels: Target number of channels (default: 1 for mono).
+
+    Returns:
+        Paths to the generated WAV files, in the same order as input_paths.
+
+    Raises:
+        FileNotFoundError: If FFmpeg command or any input file is not found.
+        RuntimeError: If the FFmpeg conversion process fails.
+        ValueError: If input arguments are invalid (e.g., bit_depth, or two
+                    inputs that would produce the same output filename).
+    """
+    if not input_paths:
+        return []
+
+    if not check_ffmpeg_availability():
+        raise FileNotFoundError(f"Command '{FFMPEG_CMD}' not found or not executable. Cannot convert audio.")
+
+    for input_path in input_paths:
+        if not input_path.is_file():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    pcm_codec = _pcm_codec(bit_depth) # e.g., pcm_s16le
+
+    output_filenames = _check_distinct_output_names(input_paths, sample_rate, bit_depth)
+
+    output_dir_str = _resolve_output_dir(output_dir)
+    output_wav_strs = [os.path.join(output_dir_str, name) for name in output_filenames]
+
+    # Construct one FFmpeg command: all inputs first, then one output group per
+    # input, each mapping the first audio stream of its input (-map N:a:0)
+    command = [FFMPEG_CMD, '-y', '-loglevel', 'error']
+    for input_path in input_paths:
+        command += ['-i', os.fspath(input_path)]
+    for index, output_wav_str in enumerate(output_wav_strs):
+        command += [
+            '-map', f'{index}:a:0',
+            '-vn',
+            '-acodec', pcm_codec,
+            '-ar', str(sample_rate),
+            '-ac', str(channels),
+            output_wav_str,
+        ]
+
+    _run_ffmpeg(command, ", ".join(str(p) for p in input_paths))
+    for output_wav_str in output_wav_strs:
+        _check_wav_output(output_wav_str)
+
+    print(f"FFmpeg batch conversion successful: {len(output_wav_strs)} file(s) in {output_dir_str}")
+    return [pathlib.Path(s) for s in output_wav_strs]
+
+def _pcm_pipe_command(
+    input_path: pathlib.Path,
+    sample_rate: int,
+    bit_depth: int,
+    channels: int
+) -> List[str]:
+    """Validates inputs and builds an FFmpeg argv that writes raw PCM to stdout."""
+    if not check_ffmpeg_availability():
+        raise FileNotFoundError(f"Command '{FFMPEG_CMD}' not found or not executable. Cannot convert audio.")
+
+    if not input_path.is_file():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    pcm_codec = _pcm_codec(bit_depth) # e.g., pcm_s16le
+
+    # -f s16le: raw PCM container (no header); pipe:1 writes it to stdout
+    return [
         FFMPEG_CMD,
         '-i', str(input_path),
         '-vn',
-        '-acodec', pcm_codec,
-        '-ar', str(sample_rate),
         '-ac', str(channels),
-        '-y',
-        '-loglevel', 'error', # Keep output clean unless error
-        # TODO: Add '-progress pipe:1' for progress reporting later
-        str(output_wav_path)
+        '-ar', str(sample_rate),
+        '-f', pcm_codec.removeprefix('pcm_'), # e.g., s16le
+        '-loglevel', 'error', # Keep stderr clean unless error
+        'pipe:1'
     ]
 
-    try:
-        _result = subprocess.run(command, check=True, capture_output=True, text=True, shell=False)
-        # print(f"DEBUG: FFmpeg stdout:\n{_result.stdout}") # Often empty with -loglevel error
-        # print(f"DEBUG: FFmpeg stderr:\n{_result.stderr}") # Can contain info even on success
-    except subprocess.CalledProcessError as e:
-        print("FFmpeg conversion failed with CalledProcessError!")
-        print(f"Command executed: {' '.join(shlex.quote(c) for c in command)}") # Use shlex.quote for safe display
-        print(f"Return code: {e.returncode}")
-        print(f"Stderr:\n{e.stderr}")
-        raise RuntimeError(f"FFmpeg conversion failed for {input_path}. Command: '{FFMPEG_CMD}'. Error: {e.stderr}") from e
-    except FileNotFoundError as e:
-        print(f"Error executing FFmpeg command (FileNotFoundError): {e}")
-        raise FileNotFoundError(f"Failed to execute command '{FFMPEG_CMD}'. Is it a valid executable and accessible? Original error: {e}") from e
+def decode_to_pcm_bytes(
+    input_path: pathlib.Path,
+    sample_rate: int = 16000,
+    bit_depth: int = 16,
+    channels: int = 1
+) -> bytes:
+    """Decodes an input audio/video file to raw PCM in memory using FFmpeg.
 
-    # Check if the output file was actually created (belt-and-suspenders)
-    if not output_wav_path.is_file() or output_wav_path.stat().st_size == 0:
-        raise RuntimeError(f"FFmpeg conversion failed to produce output file: {output_wav_path}")
+    FFmpeg writes signed little-endian PCM to stdout, so no intermediate WAV
+    file touches the disk. Useful for short clips; callers needing samples can
+    view the buffer with e.g. ``np.frombuffer(buf, dtype=np.int16)``.
+
+    Args:
+        input_path: Path to the input file.
+        sample_rate: Target sample rate in Hz (default: 16000).
+        bit_depth: Target bit depth (default: 16).
+        channels: Target number of channels (default: 1 for mono).
+
+    Returns:
+        Raw interleaved PCM samples (no WAV header).
+
+    Raises:
+        FileNotFoundError: If FFmpeg command or the input file is not found.
+        RuntimeError: If the FFmpeg decode process fails.
+        ValueError: If input arguments are invalid (e.g., bit_depth).
+    """
+    command = _pcm_pipe_command(input_path, sample_rate, bit_depth, channels)
+    result = _run_ffmpeg(command, str(input_path), stdout=subprocess.PIPE, text=False)
+    return result.stdout
+
+def stream_decode_to_pcm(
+    input_path: pathlib.Path,
+    sample_rate: int = 16000,
+    bit_depth: int = 16,
+    channels: int = 1,
+    chunk_size: int = PCM_CHUNK_BYTES
+) -> Iterator[bytes]:
+    """Decodes an input file with FFmpeg, yielding raw PCM chunks as they arrive.
+
+    Unlike decode_to_pcm_bytes, the caller can start on the first chunk while
+    FFmpeg is still decoding the rest. Closing the generator early kills FFmpeg.
+    Validation happens on the first ``next()``, as with any generator.
+
+    Args:
+        input_path: Path to the input file.
+        sample_rate: Target sample rate in Hz (default: 16000).
+        bit_depth: Target bit depth (default: 16).
+        channels: Target number of channels (default: 1 for mono).
+        chunk_size: Maximum bytes per yielded chunk.
+
+    Yields:
+        Consecutive chunks of raw interleaved PCM samples (no WAV header).
+
+    Raises:
+        FileNotFoundError: If FFmpeg command or the input file is not found.
+        RuntimeError: If FFmpeg exits with an error.
+        ValueError: If input arguments are invalid (e.g., bit_depth).
+    """
+    command = _pcm_pipe_command(input_path, sample_rate, bit_depth, channels)
+
+    # stderr goes to a temp file so a chatty FFmpeg can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=0, shell=False)
+        except FileNotFoundError as e:
+            print(f"Error executing FFmpeg command (FileNotFoundError): {e}")
+            raise FileNotFoundError(f"Failed to execute command '{FFMPEG_CMD}'. Is it a valid executable and accessible? Original error: {e}") from e
+
+        try:
+            while chunk := proc.stdout.read(chunk_size):
+                yield chunk
+            returncode = proc.wait()
+        finally:
+            if proc.poll() is None: # Consumer stopped early
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace")
+            print(f"FFmpeg decode failed with return code {returncode}!")
+            print(f"Stderr:\n{stderr}")
+            raise RuntimeError(f"FFmpeg conversion failed for {input_path}. Command: '{FFMPEG_CMD}'. Error: {stderr}")
+
+def convert_to_wav_pool(
+    input_paths: List[pathlib.Path],
+    output_dir: Optional[pathlib.Path] = None,
+    bit_depth: int = 16,
+    max_workers: Optional[int] = None
+) -> List[Union[pathlib.Path, Exception]]:
+    """Converts several input files to WAV concurrently, one FFmpeg process each.
+
+    Conversions run on a thread pool; threads are enough because each task
+    spends its time waiting on its own FFmpeg subprocess.
+
+    Args:
+        input_paths: Paths to the input files.
+        output_dir: Directory to save the output WAV files. If None, each
+                    conversion uses its own system temporary directory.
+        bit_depth: Target bit depth (default: 16).
+        max_workers: Maximum concurrent conversions (default: os.cpu_count()).
+
+    Returns:
+        One entry per input, in input order: the path to the generated WAV
+        file, or the exception raised while converting that file. A failed
+        file does not cancel the others.
+
+    Raises:
+        ValueError: If output_dir is shared and two inputs would produce the
+                    same output filename.
+    """
+    results: List[Union[pathlib.Path, Exception]] = [None] * len(input_paths) # type: ignore[list-item]
+    if not input_paths:
+        return results
+    if output_dir is not None:
+        # A shared output dir means same-stem inputs would race on one file
+        _check_distinct_output_names(input_paths, 16000, bit_depth) # convert_to_wav's default rate
 
-    print(f"FFmpeg conversion successful: {output_wav_path}")
-    return output_wav_path
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        # Map each future back to its input's position to preserve ordering
+        future_to_index = {
+            executor.submit(convert_to_wav, input_path, output_dir=output_dir, bit_depth=bit_depth): index
+            for index, input_path in enumerate(input_paths)
+        }
+        for future in as_completed(future_to_index):
+            index = future_to_index[future]
+            try:
+                results[index] = future.result()
+            except Exception as e: # Record per-file failures; siblings keep running
+                print(f"Conversion failed for {input_paths[index]}: {e}")
+                results[index] = e
+    return results
 
 # Example usage (for testing)
 if __name__ == "__main__":
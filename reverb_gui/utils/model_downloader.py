@@ -1,26 +1,73 @@
 """Handles checking for and downloading required Hugging Face models."""
 
+import functools
+import importlib.util
 import os
 import pathlib
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import MutableMapping, Optional
 
 import dotenv
-from huggingface_hub import snapshot_download
-from huggingface_hub.utils import HfHubHTTPError, LocalEntryNotFoundError
+
+# Load .env once at import, before huggingface_hub reads its HF_HUB_* flags below
+dotenv.load_dotenv() # Load .env file if present
+
+# Environment variable read by huggingface_hub (once, when it is first imported)
+ENV_HF_TRANSFER = "HF_HUB_ENABLE_HF_TRANSFER"
+
+def _enable_hf_transfer(environ: MutableMapping[str, str] = os.environ) -> bool:
+    """Opts into the multi-connection hf_transfer downloader when it is installed.
+
+    An explicit user setting, including one from .env (loaded above), is left
+    untouched. Must run before huggingface_hub is imported to take effect.
+
+    Returns:
+        True if hf_transfer is enabled in environ after the call.
+    """
+    if importlib.util.find_spec("hf_transfer") is not None:
+        environ.setdefault(ENV_HF_TRANSFER, "1")
+    return environ.get(ENV_HF_TRANSFER) == "1"
+
+_enable_hf_transfer()
+
+from huggingface_hub import snapshot_download  # noqa: E402 (must follow _enable_hf_transfer)
+from huggingface_hub.utils import HfHubHTTPError  # noqa: E402 (must follow _enable_hf_transfer)
 
 # Environment variable names
 ENV_MODELS_DIR = "REVERB_MODELS_DIR"
 ENV_HF_TOKEN = "HUGGING_FACE_HUB_TOKEN"
+ENV_DOWNLOAD_WORKERS = "REVERB_DOWNLOAD_WORKERS"
+ENV_MODEL_TTL = "REVERB_MODEL_TTL_SECONDS"
+ENV_HF_OFFLINE = "HF_HUB_OFFLINE"
+
+# Values huggingface_hub treats as "true" for its boolean env flags
+_TRUE_VALUES = {"1", "ON", "YES", "TRUE"}
 
 # Default models directory relative to project root
 DEFAULT_MODELS_DIR_NAME = "models"
 
 # Required models (Corrected based on user feedback and project code)
-REQUIRED_MODELS = [
+REQUIRED_MODELS: tuple[str, ...] = (
     "Revai/reverb-asr",
     "Revai/reverb-diarization-v2",
     # Add other models here if needed
-]
+)
+_NUM_REQUIRED_MODELS = len(REQUIRED_MODELS)
+
+# Hugging Face cache folder name for each required model (models--<org>--<name>)
+_MODEL_CACHE_SUBDIRS = {model_id: "models--" + model_id.replace("/", "--") for model_id in REQUIRED_MODELS}
+
+# Upper bound on concurrent local model checks
+MAX_MODEL_WORKERS = 8
+
+# Default number of files snapshot_download fetches in parallel per model
+DEFAULT_DOWNLOAD_WORKERS = 8
+
+# Marker file touched in the models dir after every fully successful check/download
+LAST_SYNC_MARKER = ".last_sync"
+# How long (in seconds) a sync stays trusted before models are re-verified
+DEFAULT_MODEL_TTL_SECONDS = 86400
 
 # --- Helper Functions ---
 
@@ -34,17 +81,18 @@ def _get_project_root() -> pathlib.Path:
     # Fallback if pyproject.toml is not found (should not happen in normal setup)
     return pathlib.Path.cwd()
 
+@functools.lru_cache(maxsize=1)
 def get_models_dir() -> pathlib.Path:
     """Gets the target directory for storing models.
 
     Reads from the REVERB_MODELS_DIR environment variable.
     If not set or empty, defaults to './models' relative to the project root.
-    Creates the directory if it doesn't exist.
+    Creates the directory if it doesn't exist. The result is cached for the
+    lifetime of the process; call get_models_dir.cache_clear() to re-resolve.
 
     Returns:
         An absolute pathlib.Path to the models directory.
     """
-    dotenv.load_dotenv() # Load .env file if present
     models_dir_env = os.getenv(ENV_MODELS_DIR)
 
     if models_dir_env:
@@ -63,40 +111,97 @@ def get_models_dir() -> pathlib.Path:
     print(f"Using models directory: {models_path}")
     return models_path
 
+@functools.lru_cache(maxsize=1)
 def _get_hf_token() -> Optional[str]:
-    """Gets the Hugging Face Hub token from the environment variable."""
-    dotenv.load_dotenv()
+    """Gets the Hugging Face Hub token from the environment variable.
+
+    Cached for the lifetime of the process; call _get_hf_token.cache_clear()
+    to re-read the environment.
+    """
     token = os.getenv(ENV_HF_TOKEN)
     return token if token else None
 
+def _get_env_int(name: str, default: int) -> int:
+    """Reads an integer setting from the environment, falling back to default if unset or invalid."""
+    value = os.environ.get(name, str(default))
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid {name}={value!r}, using {default}.")
+        return default
+
+def _get_download_workers() -> int:
+    """Gets the per-model file download concurrency from the environment.
+
+    Falls back to DEFAULT_DOWNLOAD_WORKERS if REVERB_DOWNLOAD_WORKERS is unset
+    or not an integer. Values below 1 are clamped to 1.
+    """
+    return max(1, _get_env_int(ENV_DOWNLOAD_WORKERS, DEFAULT_DOWNLOAD_WORKERS))
+
+def _sync_marker_is_fresh(models_dir: pathlib.Path) -> bool:
+    """Checks whether the last successful model sync is younger than the TTL.
+
+    The TTL comes from REVERB_MODEL_TTL_SECONDS (default one day); a value of
+    0 or less always forces a re-check.
+
+    Args:
+        models_dir: The local directory where models are stored.
+
+    Returns:
+        True if the .last_sync marker exists and is within the TTL.
+    """
+    ttl_seconds = _get_env_int(ENV_MODEL_TTL, DEFAULT_MODEL_TTL_SECONDS)
+    if ttl_seconds <= 0:
+        return False
+    try:
+        last_sync = (models_dir / LAST_SYNC_MARKER).stat().st_mtime
+    except OSError:
+        return False # No marker yet (or unreadable): treat as stale
+    return 0 <= time.time() - last_sync < ttl_seconds
+
+def _touch_sync_marker(models_dir: pathlib.Path) -> None:
+    """Records a successful model sync by touching the .last_sync marker."""
+    try:
+        (models_dir / LAST_SYNC_MARKER).touch()
+    except OSError as e:
+        # Not fatal: models will simply be re-verified next start-up
+        print(f"Could not update sync marker in {models_dir}: {e}")
+
 def check_model_exists(model_id: str, models_dir: pathlib.Path, hf_token: Optional[str]) -> bool:
-    """Checks if a model exists locally using huggingface_hub.
+    """Checks if a model exists locally in the Hugging Face cache layout.
+
+    Mirrors what snapshot_download(local_files_only=True) does, without the
+    library call: resolve the commit recorded in refs/main and check that its
+    snapshot directory exists. Like that check, it cannot tell whether every
+    file is present; hf_hub_download fills snapshots/<rev> one file at a
+    time, so an interrupted download still passes and has to be completed
+    by calling download_model.
 
     Args:
         model_id: The Hugging Face model ID (e.g., 'openai/whisper-large-v3').
         models_dir: The local directory where models are stored.
-        hf_token: Optional Hugging Face API token.
+        hf_token: Optional Hugging Face API token (unused, kept for signature
+            compatibility with download_model).
 
     Returns:
-        True if the model seems complete locally, False otherwise.
+        True if the snapshot for the cached main revision exists, False otherwise.
     """
+    # Cache layout: <models_dir>/models--<org>--<name>/{refs/main, snapshots/<revision>/}
+    cache_subdir = _MODEL_CACHE_SUBDIRS.get(model_id) or "models--" + model_id.replace("/", "--")
+    model_cache_dir = models_dir / cache_subdir
     try:
-        # snapshot_download with local_files_only=True will check the cache
-        # integrity and raise LocalEntryNotFoundError if incomplete or missing.
-        snapshot_download(
-            repo_id=model_id,
-            cache_dir=models_dir, # Use our specific models dir as cache
-            local_files_only=True,
-            token=hf_token,
-            repo_type="model", # Explicitly state repo type
-        )
-        print(f"Model '{model_id}' found locally.")
-        return True
-    except LocalEntryNotFoundError:
+        revision = (model_cache_dir / "refs" / "main").read_text().strip()
+        if revision and (model_cache_dir / "snapshots" / revision).is_dir():
+            print(f"Model '{model_id}' found locally.")
+            return True
         print(f"Model '{model_id}' not found locally or incomplete.")
         return False
-    except Exception as e:
-        # Catch other potential issues during the check
+    except FileNotFoundError:
+        print(f"Model '{model_id}' not found locally.") # Never downloaded: no ref yet
+        return False
+    except (OSError, UnicodeDecodeError) as e:
+        # Filesystem problems (permissions, a corrupt ref, etc.) mean "not usable";
+        # anything else is a bug and is left to propagate rather than being masked.
         print(f"Error checking local model '{model_id}': {e}")
         return False
 
@@ -124,6 +229,11 @@ def download_model(
         # if "whisper" in model_id.lower():
         #     ignore_patterns = ["*.safetensors", "*.fp16.bin"] # Example patterns
 
+        # No shared requests.Session here: huggingface_hub caches one session per
+        # thread (see huggingface_hub.get_session), because requests.Session is not
+        # thread-safe. The repo lookup reuses this thread's session across models,
+        # but file fetches run on snapshot_download's own worker pool (max_workers),
+        # whose fresh threads each open their own session and connections.
         snapshot_download(
             repo_id=model_id,
             cache_dir=models_dir, # Use our specific models dir as cache
@@ -131,6 +241,7 @@ def download_model(
             token=hf_token,
             repo_type="model",
             ignore_patterns=ignore_patterns if ignore_patterns else None,
+            max_workers=_get_download_workers(), # Fetch the repo's files in parallel
         )
         print(f"Model '{model_id}' downloaded successfully to {models_dir}.")
         return True
@@ -157,21 +268,45 @@ def ensure_models_are_downloaded() -> Optional[pathlib.Path]:
     """
     print("\n--- Checking/Downloading Required Models ---")
     models_dir = get_models_dir()
+
+    # Skip the per-model verification entirely if a recent sync succeeded
+    if _sync_marker_is_fresh(models_dir):
+        print("Models were verified recently; skipping check.")
+        print("\n--- Model Check Complete ---")
+        return models_dir
+
     hf_token = _get_hf_token()
     all_models_present = True
 
-    for model_id in REQUIRED_MODELS:
-        print(f"\nChecking for model: {model_id}")
-        if not check_model_exists(model_id, models_dir, hf_token):
-            if not download_model(model_id, models_dir, hf_token):
-                all_models_present = False
-                print(f"Failed to download required model '{model_id}'. Cannot continue.")
-                # Optionally, break here if one failure is critical
-                # break
+    # Local checks are I/O bound and independent, so fan them out across threads
+    print(f"\nChecking for models: {', '.join(REQUIRED_MODELS)}")
+    max_workers = max(1, min(MAX_MODEL_WORKERS, _NUM_REQUIRED_MODELS))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        exists = dict(zip(
+            REQUIRED_MODELS,
+            executor.map(lambda model_id: check_model_exists(model_id, models_dir, hf_token), REQUIRED_MODELS),
+        ))
+    missing_models = [model_id for model_id in REQUIRED_MODELS if not exists[model_id]]
+
+    # Offline mode cannot download anything: missing models are simply missing
+    if os.environ.get(ENV_HF_OFFLINE, "").upper() in _TRUE_VALUES:
+        for model_id in missing_models:
+            all_models_present = False
+            print(f"Required model '{model_id}' is missing and {ENV_HF_OFFLINE} is set. Cannot continue.")
+        missing_models = []
+
+    # Download missing models one at a time (snapshot_download already fetches
+    # each repo's files in parallel) so a failure can stop the rest early.
+    for model_id in missing_models:
+        if not download_model(model_id, models_dir, hf_token):
+            all_models_present = False
+            print(f"Failed to download required model '{model_id}'. Cannot continue.")
+            break # Every model is required, so the remaining downloads would be wasted
 
     print("\n--- Model Check Complete ---")
     if all_models_present:
         print("All required models are present.")
+        _touch_sync_marker(models_dir)
         return models_dir
     else:
         print("One or more required models could not be downloaded or verified.")
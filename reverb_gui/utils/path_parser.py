@@ -1,7 +1,19 @@
+import functools
 import os
 from pathlib import Path
 from typing import Optional
 
+@functools.lru_cache(maxsize=256)
+def _unquote(raw: str) -> str:
+    """Strips outer whitespace, surrounding quotes, then inner whitespace.
+
+    Depends only on its input (not on the environment), so it is safe to
+    memoize; variable expansion happens afterwards on every call.
+    """
+    s = raw.strip()      # Strip outer whitespace
+    s = s.strip('\'"')  # Strip quotes
+    return s.strip()     # Strip inner whitespace (that might have been inside quotes)
+
 def parse_env_path(raw: Optional[str]) -> Optional[Path]:
     """
     Given a raw string (e.g. from os.environ or a .env file),
@@ -10,13 +22,15 @@ def parse_env_path(raw: Optional[str]) -> Optional[Path]:
 
     Returns None if the input is None or empty after stripping.
     """
-    if not raw:
+    # Fast path for unset/blank values and bare empty quotes
+    if raw is None:
+        return None
+    stripped = raw.strip()
+    if not stripped or stripped in ('""', "''"):
         return None
 
     # 1. strip outer whitespace, then quotes, then inner whitespace
-    s = raw.strip()      # Strip outer whitespace
-    s = s.strip('\'"')  # Strip quotes
-    s = s.strip()      # Strip inner whitespace (that might have been inside quotes)
+    s = _unquote(stripped)
     if not s:
         return None # Return None if string becomes empty after stripping
 
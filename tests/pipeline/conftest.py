@@ -1,8 +1,14 @@
 import sys
+import pathlib
+import tempfile
+from contextlib import ExitStack
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator, List, Tuple
+
 import pytest
 from unittest import mock
 
-from intervaltree import Interval, IntervalTree
+from intervaltree import Interval
 from pyannote.core import Annotation, Segment
 
 from reverb_gui.pipeline import engine
@@ -30,6 +36,12 @@ def create_empty_mock_annotation() -> Annotation:
     """
     return Annotation()
 
+def _index_from_intervals(intervals: Iterable[Interval]) -> engine._SpeakerIndex:
+    """Builds the engine's speaker index from a list of intervaltree Intervals."""
+    return engine._SpeakerIndex.from_segments(
+        (interval.begin, interval.end, interval.data) for interval in intervals
+    )
+
 # --- Fixtures ---
 
 @pytest.fixture(autouse=True)
@@ -54,24 +66,128 @@ def reset_engine_globals(monkeypatch):
     sys.path = original_sys_path
 
 @pytest.fixture
-def sample_speaker_tree() -> IntervalTree:
-    """Provides a sample IntervalTree for testing speaker_for_word.
+def engine_mocks(monkeypatch) -> SimpleNamespace:
+    """Replaces the model-loading dependencies of the engine with plain MagicMocks.
+
+    All patches are applied in one batch of monkeypatch.setattr calls (undone at
+    teardown), and torch is swapped for a fake module so the real one is never
+    mutated. Defaults describe a CPU-only machine with a Hugging Face token.
+    Tests reconfigure the returned mocks, e.g. ``engine_mocks.cuda_avail.return_value``.
+    """
+    mocks = SimpleNamespace(
+        token=mock.MagicMock(name="MockGetToken", return_value="fake_token"),
+        cuda_avail=mock.MagicMock(name="MockCudaAvailable", return_value=False),
+        cuda_name=mock.MagicMock(name="MockCudaDeviceName", return_value="Fake NVIDIA GPU"),
+        device=mock.MagicMock(name="MockTorchDevice"),
+        diar_cls=mock.MagicMock(name="MockDiarizationPipeline"),
+        load_asr=mock.MagicMock(name="MockLoadASRModel"),
+    )
+    fake_torch = SimpleNamespace(
+        cuda=SimpleNamespace(is_available=mocks.cuda_avail, get_device_name=mocks.cuda_name),
+        device=mocks.device,
+    )
+    monkeypatch.setattr(engine, 'torch', fake_torch)
+    monkeypatch.setattr(engine, '_get_hf_token', mocks.token)
+    monkeypatch.setattr(engine, 'DiarizationPipeline', mocks.diar_cls)
+    monkeypatch.setattr(engine, 'load_asr_model', mocks.load_asr)
+    return mocks
+
+@pytest.fixture
+def transcribe_mocks() -> Iterator[SimpleNamespace]:
+    """Patches the collaborators of engine.transcribe inside a single ExitStack.
+
+    Yields a SimpleNamespace of the started mocks (tempdir, convert,
+    speaker_index, speaker_for_word); all are stopped together
+    when the test finishes. Targets are patched via ``mock.patch.object`` on the
+    already-imported modules, so no dotted-path lookup happens per test.
+    """
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            tempdir=stack.enter_context(mock.patch.object(tempfile, 'TemporaryDirectory')),
+            convert=stack.enter_context(mock.patch.object(engine, 'convert_to_wav')),
+            speaker_index=stack.enter_context(mock.patch.object(engine, '_SpeakerIndex')),
+            speaker_for_word=stack.enter_context(mock.patch.object(engine, 'speaker_for_word')),
+        )
+
+@pytest.fixture
+def transcribe_env(transcribe_mocks: SimpleNamespace) -> SimpleNamespace:
+    """Wires a fake TemporaryDirectory into `transcribe_mocks`.
+
+    Returns a SimpleNamespace with the fake ``temp_dir`` path, the
+    ``temp_instance`` mock returned by TemporaryDirectory(), and a
+    ``make_wav(input_path)`` helper that also sets it as convert_to_wav's result.
+    """
+    temp_dir = pathlib.Path("/fake/temp/dir")
+    temp_instance = mock.MagicMock(name="MockTemporaryDirectory")
+    temp_instance.name = str(temp_dir)
+    transcribe_mocks.tempdir.return_value = temp_instance
+
+    def make_wav(input_path: pathlib.Path) -> pathlib.Path:
+        wav_path = temp_dir / f"{input_path.stem}.wav"
+        transcribe_mocks.convert.return_value = wav_path
+        return wav_path
+
+    return SimpleNamespace(temp_dir=temp_dir, temp_instance=temp_instance, make_wav=make_wav)
+
+@pytest.fixture(scope="session")
+def _annotation_spec() -> List[str]:
+    """Attribute names of pyannote's Annotation, introspected once per session."""
+    return dir(Annotation)
+
+@pytest.fixture
+def make_annotation(_annotation_spec: List[str]) -> Callable[[List[Tuple[Segment, str, str]]], mock.MagicMock]:
+    """Factory for mock diarization results restricted to Annotation's attributes.
+
+    ``make_annotation(segments)`` returns a mock whose ``itertracks`` yields the
+    given (segment, track, label) triples and which is falsy when they are empty.
+    """
+    def _make(segments: List[Tuple[Segment, str, str]]) -> mock.MagicMock:
+        # Configure both return values in the constructor (via configure_mock)
+        return mock.MagicMock(spec=_annotation_spec, **{
+            'itertracks.return_value': segments,
+            '__bool__.return_value': bool(segments),
+        })
+    return _make
+
+@pytest.fixture
+def index_from_intervals() -> Callable[[Iterable[Interval]], engine._SpeakerIndex]:
+    """Provides the helper that builds a speaker index from intervaltree Intervals."""
+    return _index_from_intervals
+
+@pytest.fixture
+def sample_speaker_index() -> engine._SpeakerIndex:
+    """Provides a sample speaker index for testing speaker_for_word.
 
     Based on the version defined in the original test_engine.py (lines 101-113).
     """
-    tree = IntervalTree()
-    # SPK_0: 0.0s - 2.0s
-    tree.add(Interval(0.0, 2.0, "SPK_0"))
-    # SPK_1: 1.5s - 3.5s (overlaps SPK_0)
-    tree.add(Interval(1.5, 3.5, "SPK_1"))
-    # SPK_0: 4.0s - 5.0s (gap between 3.5s and 4.0s)
-    tree.add(Interval(4.0, 5.0, "SPK_0"))
-    # SPK_2: 6.0s - 7.0s (another gap)
-    tree.add(Interval(6.0, 7.0, "SPK_2"))
-    return tree
+    return _index_from_intervals([
+        # SPK_0: 0.0s - 2.0s
+        Interval(0.0, 2.0, "SPK_0"),
+        # SPK_1: 1.5s - 3.5s (overlaps SPK_0)
+        Interval(1.5, 3.5, "SPK_1"),
+        # SPK_0: 4.0s - 5.0s (gap between 3.5s and 4.0s)
+        Interval(4.0, 5.0, "SPK_0"),
+        # SPK_2: 6.0s - 7.0s (another gap)
+        Interval(6.0, 7.0, "SPK_2"),
+    ])
+
+@pytest.fixture(scope="session")
+def _session_model_mocks() -> SimpleNamespace:
+    """Builds the mock models and loader replacements once per test session.
+
+    Plain MagicMocks (no autospec) keep construction cheap; `mock_models`
+    resets them before every test so no call state leaks between tests.
+    """
+    return SimpleNamespace(
+        asr=mock.MagicMock(name="MockASRModel_Fixture"),
+        diarization=mock.MagicMock(name="MockDiarModel_Fixture"),
+        load_asr=mock.MagicMock(name="MockLoadASR_Fixture"),
+        diar_pipeline_cls=mock.MagicMock(name="MockDiarPipeline_Fixture"),
+        get_token=mock.MagicMock(name="MockGetToken_Fixture"),
+    )
 
 @pytest.fixture # Removed autouse=True
-def mock_models(monkeypatch):
+def mock_models(_session_model_mocks: SimpleNamespace, monkeypatch):
     """Fixture to mock model loading and interaction.
 
     Sets up mock ASR and Diarization models in the engine's cache and marks
@@ -79,45 +195,32 @@ def mock_models(monkeypatch):
     Tests needing this fixture must explicitly request it or use a marker.
     Based on the fixture defined in the original test_engine.py (lines 403-426).
     """
+    cached = _session_model_mocks
+    for cached_mock in vars(cached).values():
+        cached_mock.reset_mock(return_value=True, side_effect=True)
+
     # If models are already loaded (e.g., by a previous test's specific setup),
     # respect that state. This allows tests specifically testing loading to work.
+    # Entries go into the per-test dict installed by reset_engine_globals via
+    # monkeypatch, so nothing leaks between tests (or xdist workers).
     if not engine._models_loaded:
-        mock_asr_model = mock.MagicMock(name="MockASRModel_Fixture")
-        mock_diar_model = mock.MagicMock(name="MockDiarModel_Fixture")
-        mock_cache = {
-            'asr': mock_asr_model,
-            'diarization': mock_diar_model
-        }
-        monkeypatch.setattr(engine, '_cached_models', mock_cache)
+        monkeypatch.setitem(engine._cached_models, 'asr', cached.asr)
+        monkeypatch.setitem(engine._cached_models, 'diarization', cached.diarization)
         monkeypatch.setattr(engine, '_models_loaded', True)
-    else:
-        # If models were already loaded, just yield without changing state
-        pass
 
     # Mock the functions that *perform* loading, so they don't run
-    # Use start/stop for manual patch management within the fixture scope
-    patcher_load_asr = mock.patch('reverb_gui.pipeline.engine.load_asr_model', autospec=True)
-    patcher_diar_pipeline = mock.patch('reverb_gui.pipeline.engine.DiarizationPipeline', autospec=True)
-    patcher_get_token = mock.patch('reverb_gui.pipeline.engine._get_hf_token', autospec=True)
-
-    # Start the patchers
-    mock_load_asr_func = patcher_load_asr.start()
-    mock_diar_pipeline_cls = patcher_diar_pipeline.start()
-    mock_get_token_func = patcher_get_token.start()
+    monkeypatch.setattr(engine, 'load_asr_model', cached.load_asr)
+    monkeypatch.setattr(engine, 'DiarizationPipeline', cached.diar_pipeline_cls)
+    monkeypatch.setattr(engine, '_get_hf_token', cached.get_token)
 
     # Provide default return values consistent with original fixture
-    mock_get_token_func.return_value = "mock_hf_token_fixture"
+    cached.get_token.return_value = "mock_hf_token_fixture"
     # Retrieve potentially pre-existing mocks if engine was already 'loaded'
     diar_mock_in_cache = engine._cached_models.get('diarization', mock.MagicMock(name="FallbackDiarMockFixture"))
     asr_mock_in_cache = engine._cached_models.get('asr', mock.MagicMock(name="FallbackASRMockFixture"))
-    mock_diar_pipeline_cls.from_pretrained.return_value = diar_mock_in_cache
-    mock_load_asr_func.return_value = asr_mock_in_cache
+    cached.diar_pipeline_cls.from_pretrained.return_value = diar_mock_in_cache
+    cached.load_asr.return_value = asr_mock_in_cache
 
     yield # Allow tests to run with these mocks
 
-    # Stop the patchers in reverse order
-    patcher_get_token.stop()
-    patcher_diar_pipeline.stop()
-    patcher_load_asr.stop()
-
-    # Cleanup: reset_engine_globals fixture handles resetting _models_loaded/_cached_models
+    # Cleanup: monkeypatch restores the loaders; reset_engine_globals resets _models_loaded/_cached_models
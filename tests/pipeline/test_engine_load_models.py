@@ -1,11 +1,14 @@
+import operator
 import pytest
 import pathlib
+from types import SimpleNamespace
+from typing import Dict, NamedTuple
 from unittest import mock
 
 # Module to test
 from reverb_gui.pipeline import engine
 
-# Note: Fixtures like `reset_engine_globals` are automatically used from conftest.py
+# Note: Fixtures like `reset_engine_globals` and `engine_mocks` are automatically used from conftest.py
 
 # === Tests for _load_models_if_needed (originally in test_engine.py) ===
 
@@ -16,80 +19,53 @@ from reverb_gui.pipeline import engine
         (True, "cuda", 0),    # Test CUDA case (assuming index 0)
     ]
 )
-@mock.patch('reverb_gui.pipeline.engine._get_hf_token')
-@mock.patch('reverb_gui.pipeline.engine.torch.cuda.is_available')
-@mock.patch('reverb_gui.pipeline.engine.torch.cuda.get_device_name')
-@mock.patch('reverb_gui.pipeline.engine.torch.device')
-@mock.patch('reverb_gui.pipeline.engine.DiarizationPipeline') # Mock the class
-@mock.patch('reverb_gui.pipeline.engine.load_asr_model')
-@mock.patch('builtins.print') # Mock print to suppress output during test
 def test_load_models_if_needed_success(
-    mock_print: mock.MagicMock,
-    mock_load_asr: mock.MagicMock,
-    mock_diar_pipeline_cls: mock.MagicMock, # Class mock
-    mock_torch_device: mock.MagicMock,
-    mock_cuda_get_name: mock.MagicMock,
-    mock_cuda_available: mock.MagicMock,
-    mock_get_token: mock.MagicMock,
+    engine_mocks: SimpleNamespace,
     cuda_available: bool,
     expected_device_str: str,
     expected_gpu_index: int | None,
     tmp_path: pathlib.Path, # Added fixture
-    # Note: `monkeypatch` is available via pytest, `reset_engine_globals` is from conftest
+    capsys: pytest.CaptureFixture[str],
+    # Note: `reset_engine_globals` is from conftest
 ) -> None:
     """Test _load_models_if_needed successfully loads models (CPU/CUDA).
     Originally from test_engine.py line 153.
     """
     # --- Arrange ---
     # Global state reset by reset_engine_globals
+    engine_mocks.cuda_avail.return_value = cuda_available
 
-    _fake_models_dir = pathlib.Path("/fake/models/path")
-    fake_token = "fake_hf_token"
-    mock_get_token.return_value = fake_token
-    mock_cuda_available.return_value = cuda_available
-    mock_cuda_get_name.return_value = "Fake NVIDIA GPU"
-    mock_torch_device_instance = mock.MagicMock(name="MockTorchDevice")
-    mock_torch_device.return_value = mock_torch_device_instance
-
-    # Mock the DiarizationPipeline instance and its methods
+    # Mock the DiarizationPipeline instance and the ASR model instance
     mock_diar_instance = mock.MagicMock(name="MockDiarPipelineInstance")
-    mock_diar_pipeline_cls.from_pretrained.return_value = mock_diar_instance
-
-    # Mock the ASR model instance
+    engine_mocks.diar_cls.from_pretrained.return_value = mock_diar_instance
     mock_asr_instance = mock.MagicMock(name="MockASRInstance")
-    mock_load_asr.return_value = mock_asr_instance
+    engine_mocks.load_asr.return_value = mock_asr_instance
 
     # Construct expected path for ASR model load call
     expected_asr_model_path_str = f"models--{engine.ASR_MODEL_ID.replace('/', '--')}"
     expected_asr_path = tmp_path / expected_asr_model_path_str
 
-    # Explicitly reset the mock before the action to isolate calls within the function
-    mock_cuda_available.reset_mock()
-    mock_cuda_available.return_value = cuda_available # Restore return value after reset
-
     # --- Act ---
     engine._load_models_if_needed(models_dir=tmp_path)
 
     # --- Assert ---
-    # Verify core setup functions (excluding ensure_models_are_downloaded)
-    mock_get_token.assert_called_once()
-    mock_torch_device.assert_called_once_with(expected_device_str)
+    # Verify core setup functions
+    engine_mocks.token.assert_called_once()
+    engine_mocks.device.assert_called_once_with(expected_device_str)
     # Assert based on observed behavior (2 calls), even if unexpected
-    assert mock_cuda_available.call_count == 2
+    assert engine_mocks.cuda_avail.call_count == 2
     if cuda_available:
-        # When CUDA is available, is_available() is checked once
-        mock_cuda_get_name.assert_called_once_with(expected_gpu_index)
+        engine_mocks.cuda_name.assert_called_once_with(expected_gpu_index)
     else:
-        # When CUDA is NOT available, is_available() is still checked once
-        mock_cuda_get_name.assert_not_called()
+        engine_mocks.cuda_name.assert_not_called()
 
     # Verify model loading calls
-    mock_diar_pipeline_cls.from_pretrained.assert_called_once_with(
+    engine_mocks.diar_cls.from_pretrained.assert_called_once_with(
         engine.DIARIZATION_MODEL_ID,
-        use_auth_token=fake_token,
+        use_auth_token="fake_token",
         cache_dir=str(tmp_path) # Expect string representation of the path passed to the function
     )
-    mock_load_asr.assert_called_once_with(
+    engine_mocks.load_asr.assert_called_once_with(
         model=str(expected_asr_path), # Pass model path as string
         gpu=expected_gpu_index       # Pass the GPU index (or None)
     )
@@ -98,13 +74,10 @@ def test_load_models_if_needed_success(
     assert engine._models_loaded
     assert engine._cached_models['asr'] == mock_asr_instance
     assert engine._cached_models['diarization'] == mock_diar_instance
-    mock_print.assert_called() # Ensure some logging occurred
+    assert "Engine: Models loaded successfully" in capsys.readouterr().out # Ensure some logging occurred
 
-@mock.patch('reverb_gui.pipeline.engine.load_asr_model')
-@mock.patch('reverb_gui.pipeline.engine.DiarizationPipeline')
 def test_load_models_if_needed_caching(
-    mock_diar_pipeline_cls: mock.MagicMock,
-    mock_load_asr: mock.MagicMock,
+    engine_mocks: SimpleNamespace,
     monkeypatch, # Need to manually set initial loaded state
     tmp_path: pathlib.Path # Added fixture
 ) -> None:
@@ -121,127 +94,72 @@ def test_load_models_if_needed_caching(
 
     # --- Assert ---
     # Assert that loading functions were NOT called this time
-    mock_diar_pipeline_cls.from_pretrained.assert_not_called()
-    mock_load_asr.assert_not_called()
+    engine_mocks.diar_cls.from_pretrained.assert_not_called()
+    engine_mocks.load_asr.assert_not_called()
     # Check that the cache remains untouched
     assert engine._cached_models['asr'] == 'dummy_asr'
 
-@mock.patch('builtins.print')
-def test_load_models_if_needed_fail_download(
-    mock_print: mock.MagicMock,
-    tmp_path: pathlib.Path # Added fixture
-    # monkeypatch # reset_engine_globals handles state reset
+class FailureCase(NamedTuple):
+    """One failure-injection scenario for _load_models_if_needed."""
+    step: str
+    failing_mock: str # Attribute path on the engine_mocks namespace
+    exc: Exception
+    expected_calls: Dict[str, int]
+
+
+FAILURE_CASES = [
+    # Token lookup fails before any model is touched (stands in for the old
+    # "download" failure; downloads are verified before the engine is used).
+    FailureCase("token", "token", RuntimeError("Token lookup failed!"),
+                {"token": 1, "diar": 0, "asr": 0}),
+    FailureCase("diar", "diar_cls.from_pretrained", RuntimeError("Diarization load error!"),
+                {"token": 1, "diar": 1, "asr": 0}),
+    FailureCase("asr", "load_asr", RuntimeError("ASR load error!"),
+                {"token": 1, "diar": 1, "asr": 1}),
+]
+
+@pytest.mark.parametrize("case", FAILURE_CASES, ids=lambda c: c.step)
+def test_load_models_if_needed_failure(
+    engine_mocks: SimpleNamespace,
+    case: FailureCase,
+    tmp_path: pathlib.Path
 ) -> None:
-    """Test _load_models_if_needed raises RuntimeError if download fails.
-    Originally from test_engine.py line 277.
-    (Note: Due to refactoring, this now effectively tests the failure
-     when loading models from an empty/invalid path, as the initial
-     download check is handled elsewhere.)
-    """
-    # --- Act & Assert ---
-    # Expect the error raised when wenet's load_asr_model fails on empty dir
-    with pytest.raises(RuntimeError, match=r"Failed to load models: .*reverb_asr_v1"):
-        engine._load_models_if_needed(models_dir=tmp_path)
-
-    # Ensure state reflects failure
-    assert engine._models_loaded is False
-    assert engine._cached_models == {}
-    assert mock_print.call_count > 0
-
-@mock.patch('reverb_gui.pipeline.engine._get_hf_token', return_value="fake_token")
-@mock.patch('reverb_gui.pipeline.engine.torch.cuda.is_available', return_value=False) # CPU
-@mock.patch('reverb_gui.pipeline.engine.torch.device')
-@mock.patch('reverb_gui.pipeline.engine.DiarizationPipeline.from_pretrained', side_effect=RuntimeError("Diarization load error!"))
-@mock.patch('builtins.print')
-def test_load_models_if_needed_fail_diar_load(
-    mock_print: mock.MagicMock,
-    mock_diar_from_pretrained: mock.MagicMock,
-    mock_torch_device: mock.MagicMock,
-    mock_cuda_available: mock.MagicMock,
-    mock_get_token: mock.MagicMock,
-    tmp_path: pathlib.Path # Added fixture
-    # monkeypatch
-) -> None:
-    """Test _load_models_if_needed raises RuntimeError if diarization model load fails.
-    Originally from test_engine.py line 298.
+    """Test _load_models_if_needed raises RuntimeError when any loading step fails.
+    Replaces the separate _fail_download/_fail_diar_load/_fail_asr_load tests
+    originally from test_engine.py lines 277, 298 and 334.
     """
     # --- Arrange ---
-    _fake_models_dir = pathlib.Path("/fake/path")
+    operator.attrgetter(case.failing_mock)(engine_mocks).side_effect = case.exc
 
     # --- Act & Assert ---
-    with pytest.raises(RuntimeError, match="Diarization load error!"):
+    with pytest.raises(RuntimeError, match=f"Failed to load models: {case.exc}"):
         engine._load_models_if_needed(models_dir=tmp_path)
 
     # Ensure state reflects failure
     assert engine._models_loaded is False
     assert engine._cached_models == {}
     # Verify setup calls up to the point of failure
-    mock_get_token.assert_called_once()
-    assert mock_cuda_available.call_count == 2
-    mock_torch_device.assert_called_once_with("cpu")
-    mock_diar_from_pretrained.assert_called_once_with(
-        engine.DIARIZATION_MODEL_ID, 
-        use_auth_token="fake_token",
-        cache_dir=str(tmp_path) # Expect the path passed to the function
-    )
+    assert engine_mocks.token.call_count == case.expected_calls["token"]
+    assert engine_mocks.diar_cls.from_pretrained.call_count == case.expected_calls["diar"]
+    assert engine_mocks.load_asr.call_count == case.expected_calls["asr"]
+    if case.expected_calls["diar"]:
+        engine_mocks.device.assert_called_once_with("cpu")
+        engine_mocks.diar_cls.from_pretrained.assert_called_once_with(
+            engine.DIARIZATION_MODEL_ID,
+            use_auth_token="fake_token",
+            cache_dir=str(tmp_path) # Expect the path passed to the function
+        )
+    if case.expected_calls["asr"]:
+        expected_asr_path = tmp_path / f"models--{engine.ASR_MODEL_ID.replace('/', '--')}"
+        engine_mocks.load_asr.assert_called_once_with(
+            model=str(expected_asr_path), # Pass model path as string
+            gpu=None                     # Expect None for GPU index in CPU case
+        )
 
-@mock.patch('reverb_gui.pipeline.engine._get_hf_token', return_value="fake_token")
-@mock.patch('reverb_gui.pipeline.engine.torch.cuda.is_available', return_value=False) # CPU
-@mock.patch('reverb_gui.pipeline.engine.torch.device')
-@mock.patch('reverb_gui.pipeline.engine.DiarizationPipeline')
-@mock.patch('reverb_gui.pipeline.engine.load_asr_model', side_effect=RuntimeError("ASR load error!"))
-@mock.patch('builtins.print')
-def test_load_models_if_needed_fail_asr_load(
-    mock_print: mock.MagicMock,
-    mock_load_asr: mock.MagicMock,
-    mock_diar_pipeline_cls: mock.MagicMock,
-    mock_torch_device: mock.MagicMock,
-    mock_cuda_available: mock.MagicMock,
-    mock_get_token: mock.MagicMock,
-    tmp_path: pathlib.Path # Added fixture
-    # monkeypatch
-) -> None:
-    """Test _load_models_if_needed raises RuntimeError if ASR model load fails.
-    Originally from test_engine.py line 334.
-    """
-    # --- Arrange ---
-    _fake_models_dir = pathlib.Path("/fake/models/path")
-    mock_diar_instance = mock.MagicMock(name="MockDiarPipelineInstance")
-    mock_diar_pipeline_cls.from_pretrained.return_value = mock_diar_instance
-    mock_cpu_device = mock.MagicMock(name="MockCPUDevice")
-    mock_torch_device.return_value = mock_cpu_device
-
-    expected_asr_model_path_str = f"models--{engine.ASR_MODEL_ID.replace('/', '--')}"
-    expected_asr_path = tmp_path / expected_asr_model_path_str
-
-    # --- Act & Assert ---
-    with pytest.raises(RuntimeError, match="ASR load error!"):
-        engine._load_models_if_needed(models_dir=tmp_path)
-
-    # Ensure state reflects failure
-    assert engine._models_loaded is False
-    assert engine._cached_models == {}
-    # Verify setup calls up to the point of failure
-    mock_get_token.assert_called_once()
-    assert mock_cuda_available.call_count == 2
-    mock_torch_device.assert_called_once_with("cpu")
-    mock_diar_pipeline_cls.from_pretrained.assert_called_once_with(
-        engine.DIARIZATION_MODEL_ID,
-        use_auth_token="fake_token",
-        cache_dir=str(tmp_path) # Expect the path passed to the function
-    )
-    mock_load_asr.assert_called_once_with(
-        model=str(expected_asr_path), # Pass model path as string
-        gpu=None                     # Expect None for GPU index in CPU case
-    )
-
-@mock.patch('reverb_gui.pipeline.engine.torch.cuda.is_available', return_value=False)
-@mock.patch('builtins.print')
 def test_load_models_if_needed_already_loaded(
-    mock_print: mock.MagicMock,
-    mock_cuda_is_available: mock.MagicMock, # Added mock
-    reset_engine_globals: None, # Added fixture
-    tmp_path: pathlib.Path # Added fixture
+    engine_mocks: SimpleNamespace,
+    tmp_path: pathlib.Path, # Added fixture
+    capsys: pytest.CaptureFixture[str],
 ) -> None:
     """Test that models are not reloaded if already loaded.
     Originally from test_engine.py line 243.
@@ -258,9 +176,9 @@ def test_load_models_if_needed_already_loaded(
     # --- Assert ---
     # Assert that the 'already loaded' message was printed exactly once
     expected_message = f"Engine: Models already loaded (using dir: {tmp_path}). Skipping load."
-    mock_print.assert_called_once_with(expected_message)
+    assert capsys.readouterr().out == f"{expected_message}\n"
     # Verify the CUDA check is NOT called because the function returns early
-    mock_cuda_is_available.assert_not_called()
+    engine_mocks.cuda_avail.assert_not_called()
 
     # Check that the cache remains untouched
     assert engine._cached_models['asr'] == 'dummy_asr'
@@ -1,550 +1,320 @@
 import pytest
 import pathlib
-from typing import Dict, Any
+from dataclasses import dataclass
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Callable, Dict
 from unittest import mock
 
-from pyannote.core import Annotation, Segment
+from pyannote.core import Segment
 
 # Module to test
 from reverb_gui.pipeline import engine
-# Import helpers from conftest (needed for explicit calls, fixtures are auto-used)
-from .conftest import create_empty_mock_annotation # Import from sibling conftest
 # Import shared fixtures/helpers implicitly from conftest.py
 # Explicit imports are not needed for fixtures like mock_models, MOCK_CTM_OUTPUT,
 # create_mock_annotation, create_empty_mock_annotation
 
+# Keyword arguments transcribe passes to the ASR model when asr_params is empty
+_DEFAULT_ASR_KWARGS = MappingProxyType({
+    "mode": "attention_rescoring",
+    "beam_size": 10,
+    "length_penalty": 0.0,
+    "ctc_weight": 0.1,
+    "reverse_weight": 0.0,
+    "blank_penalty": 0.0,
+    "verbatimicity": 1.0,
+    "format": "ctm",
+})
+
+# Non-default ASR parameters, and the kwargs transcribe should forward for them
+_CUSTOM_ASR_PARAMS = MappingProxyType({
+    "mode": "attention",
+    "beam_size": 5,
+    "length_penalty": -0.5,
+    "ctc_weight": 0.8,
+    "reverse_weight": 0.3,
+    "blank_penalty": 1.5,
+    "verbatimicity": 0.2,
+})
+_CUSTOM_ASR_KWARGS = MappingProxyType({**_CUSTOM_ASR_PARAMS, "format": "ctm"}) # Fixed format is still passed
+
+# Input file shared by all transcribe tests (conversion is always mocked)
+_INPUT_PATH = pathlib.Path("input.wav")
+
+# Sample ASR output rows, rendered into CTM text by _ctm()
+_CTM_TEMPLATE = "{stem} 1 {start:.2f} {dur:.2f} {word} {conf:.2f}\n"
+_THREE_WORD_ROWS = (
+    dict(start=0.50, dur=0.30, word="hello", conf=1.00),  # Speaker 0
+    dict(start=1.20, dur=0.40, word="world", conf=0.95),  # Speaker 1
+    dict(start=2.10, dur=0.25, word="reverb", conf=0.88), # Speaker 1
+)
+_TWO_WORD_ROWS = _THREE_WORD_ROWS[:2]
+
+# Speaker assigned to each sample word, keyed by its CTM start time
+_SPK_BY_START = MappingProxyType({0.50: "SPK_0", 1.20: "SPK_1", 2.10: "SPK_1"})
+
+@dataclass(frozen=True, slots=True)
+class Word:
+    """One (start, end, speaker, text) row of transcribe's output, for readable diffs."""
+    start: float
+    end: float
+    speaker: str
+    text: str
+
+def _ctm(stem: str, rows) -> str:
+    """Renders CTM rows for the given audio file stem."""
+    return "".join(_CTM_TEMPLATE.format(stem=stem, **row) for row in rows)
 
 # === Tests for transcribe (originally in test_engine.py) ===
 
-# Mock external dependencies used directly by transcribe
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@mock.patch('reverb_gui.pipeline.engine.IntervalTree')
-@mock.patch('collections.defaultdict')
-@mock.patch('reverb_gui.pipeline.engine.speaker_for_word')
+# External dependencies used directly by transcribe are mocked by the
+# `transcribe_mocks` fixture from conftest.py
+@pytest.mark.parametrize(
+    "asr_params, expected_asr_kwargs",
+    [
+        ({}, _DEFAULT_ASR_KWARGS),                        # Defaults filled in by transcribe
+        (dict(_CUSTOM_ASR_PARAMS), _CUSTOM_ASR_KWARGS),   # Caller values passed through
+    ],
+    ids=["default_params", "custom_params"],
+)
 @pytest.mark.usefixtures("mock_models") # Explicitly use the model mocking fixture
 def test_transcribe_success(
-    # Correct parameter order
-    mock_speaker_helper: mock.MagicMock, # Decorator 6: speaker_for_word
-    mock_defaultdict: mock.MagicMock, # Decorator 5: defaultdict
-    mock_interval_tree: mock.MagicMock, # Decorator 4: IntervalTree
-    mock_convert: mock.MagicMock, # Decorator 3: convert_to_wav
-    mock_tempfile: mock.MagicMock, # Decorator 2: tempfile module
-    mock_print: mock.MagicMock, # Decorator 1: print
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Auto-used fixtures from conftest handle state/model setup
-    # Explicitly use mock_models fixture from conftest
+    transcribe_mocks: SimpleNamespace,
+    transcribe_env: SimpleNamespace,
+    make_annotation: Callable[..., mock.MagicMock],
+    tmp_path,
+    asr_params: Dict[str, Any],
+    expected_asr_kwargs: MappingProxyType,
 ) -> None:
     """Test successful transcription pipeline.
     Originally from test_engine.py line 431.
+    Also covers asr_params propagation (formerly test_transcribe_passes_asr_params).
     Uses mock_models fixture implicitly.
     """
     # --- Arrange ---
-    input_path = pathlib.Path("test_input.mp4")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Setup mock return values
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path) # Set the name attribute
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
+    wav_path = transcribe_env.make_wav(_INPUT_PATH)
 
     # Mock model interactions (using the mocks set up by mock_models fixture)
     mock_diar_model = engine._cached_models['diarization'] # Get mock from cache
     mock_asr_model = engine._cached_models['asr']         # Get mock from cache
 
     # Mock diarization result (pyannote.core.Annotation structure)
-    mock_annotation = mock.MagicMock(spec=Annotation)
-    # Simulate segments for pyannote.core.Annotation
-    mock_segments = [
+    mock_diar_model.return_value = make_annotation([
         (Segment(0.0, 1.0), 'track1', 'SPK_0'),
         (Segment(1.1, 2.5), 'track2', 'SPK_1'),
-    ]
-    mock_annotation.itertracks.return_value = mock_segments
-    mock_diar_model.return_value = mock_annotation
+    ])
 
     # Simulate ASR CTM output string
-    sample_ctm_output = (
-        f"{wav_path.stem} 1 0.50 0.30 hello 1.00\n" # Speaker 0
-        f"{wav_path.stem} 1 1.20 0.40 world 0.95\n" # Speaker 1
-        f"{wav_path.stem} 1 2.10 0.25 reverb 0.88\n" # Speaker 1
-    )
-    mock_asr_model.transcribe.return_value = sample_ctm_output
-
-    # Mock speaker assignment helper
-    # Define side effect based on expected calls
-    def speaker_side_effect(start, duration, tree):
-        if start == 0.50:
-            return "SPK_0"
-        elif start == 1.20 or start == 2.10:
-            return "SPK_1"
-        return "UNKNOWN" # Fallback
-    mock_speaker_helper.side_effect = speaker_side_effect
+    mock_asr_model.transcribe.return_value = _ctm(wav_path.stem, _THREE_WORD_ROWS)
+
+    # Mock speaker assignment helper: look the speaker up by word start time
+    transcribe_mocks.speaker_for_word.side_effect = lambda start, duration, index: _SPK_BY_START.get(start, "UNKNOWN")
 
     # --- Act ---
-    result = engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
+    result = engine.transcribe(_INPUT_PATH, models_dir=tmp_path, asr_params=asr_params)
 
     # --- Assert ---
     # Verify setup calls
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect the Path object
+    transcribe_mocks.tempdir.assert_called_once()
+    transcribe_mocks.convert.assert_called_once_with(_INPUT_PATH, output_dir=transcribe_env.temp_dir) # Expect the Path object
 
     # Verify model calls
     mock_diar_model.assert_called_once_with(str(wav_path))
 
-    # Verify IntervalTree creation and population based on mock_segments
-    mock_interval_tree.assert_called_once()
-    expected_tree_calls = [
-        mock.call(engine.Interval(0.0, 1.0, 'SPK_0')),
-        mock.call(engine.Interval(1.1, 2.5, 'SPK_1')),
-    ]
-    mock_interval_tree.return_value.add.assert_has_calls(expected_tree_calls, any_order=True)
+    # Verify the speaker index is built from mock_segments
+    transcribe_mocks.speaker_index.from_segments.assert_called_once_with([
+        (0.0, 1.0, 'SPK_0'),
+        (1.1, 2.5, 'SPK_1'),
+    ])
 
     # Verify ASR call
-    mock_asr_model.transcribe.assert_called_once_with(
-        str(wav_path),
-        mode="attention_rescoring",
-        beam_size=10,
-        length_penalty=0.0,
-        ctc_weight=0.1,
-        reverse_weight=0.0,
-        blank_penalty=0.0,
-        verbatimicity=1.0,
-        format="ctm"
-    )
+    mock_asr_model.transcribe.assert_called_once_with(str(wav_path), **expected_asr_kwargs)
 
     # Verify speaker_for_word calls based on sample CTM
-    expected_speaker_calls = [
-        mock.call(0.50, 0.30, mock_interval_tree.return_value), # hello -> SPK_0
-        mock.call(1.20, 0.40, mock_interval_tree.return_value), # world -> SPK_1
-        mock.call(2.10, 0.25, mock_interval_tree.return_value), # reverb -> SPK_1
+    # Compare plain argument tuples rather than building mock.call objects
+    index = transcribe_mocks.speaker_index.from_segments.return_value
+    expected_speaker_args = [
+        (0.50, 0.30, index), # hello -> SPK_0
+        (1.20, 0.40, index), # world -> SPK_1
+        (2.10, 0.25, index), # reverb -> SPK_1
     ]
-    mock_speaker_helper.assert_has_calls(expected_speaker_calls)
+    assert [c.args for c in transcribe_mocks.speaker_for_word.call_args_list] == expected_speaker_args
 
     # Verify final output format
     expected_output = [
-        (0.50, 0.80, "SPK_0", "hello"), # start, start + duration, speaker, word
-        (1.20, 1.60, "SPK_1", "world"),
-        (2.10, 2.35, "SPK_1", "reverb"),
+        Word(0.50, 0.80, "SPK_0", "hello"), # start, start + duration, speaker, word
+        Word(1.20, 1.60, "SPK_1", "world"),
+        Word(2.10, 2.35, "SPK_1", "reverb"),
     ]
-    assert result == expected_output
+    assert [Word(*row) for row in result] == expected_output
 
     # Verify temp dir cleanup
     # Check cleanup() was called on the specific instance we created
-    mock_temp_dir_instance.cleanup.assert_called_once()
-    mock_print.assert_called() # Check for some logging
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav', side_effect=RuntimeError("Conversion failed!"))
-@pytest.mark.usefixtures("mock_models") # Models not used, but fixture provides state reset
-def test_transcribe_conversion_failure(
-    mock_convert: mock.MagicMock, # Decorator 3
-    mock_tempfile: mock.MagicMock, # Decorator 2
-    mock_print: mock.MagicMock, # Decorator 1
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Autouse fixture from conftest handles reset
-) -> None:
-    """Test transcribe handles failure during the convert_to_wav step.
-    Originally from test_engine.py line 526.
-    """
-    # --- Arrange ---
-    input_path = pathlib.Path("input.avi")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-    # The cleanup won't be called in this failure case, so no need to mock it
-
-    mock_diar_model = engine._cached_models.get('diarization') # Should exist from fixture
-    mock_asr_model = engine._cached_models.get('asr')         # Should exist from fixture
-
-    # --- Act & Assert ---
-    with pytest.raises(RuntimeError, match="Conversion failed!"):
-        engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
-
-    # Verify calls up to failure point
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect the Path object
-
-    # Verify models were NOT called
-    assert mock_diar_model is not None and not mock_diar_model.called
-    assert mock_asr_model is not None and not mock_asr_model.transcribe.called
-
-    # Verify temp dir cleanup still happened
-    mock_temp_dir_instance.cleanup.assert_called_once() # Check for cleanup call
-    mock_print.assert_called()
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@pytest.mark.usefixtures("mock_models") # Needs mocked diarization model
-def test_transcribe_diarization_failure(
-    mock_convert: mock.MagicMock, # Decorator 3
-    mock_tempfile: mock.MagicMock, # Decorator 2
-    mock_print: mock.MagicMock, # Decorator 1
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Autouse fixture from conftest handles reset and models
-) -> None:
-    """Test transcribe handles failure during the diarization step.
-    Originally from test_engine.py line 565.
-    """
-    # --- Arrange ---
-    input_path = pathlib.Path("input.flac")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
-
-    # Get mock models from cache (populated by fixture)
-    mock_diar_model = engine._cached_models['diarization']
-    mock_asr_model = engine._cached_models['asr']
-    # Setup diarization to fail
-    mock_diar_model.side_effect = RuntimeError("Diarization crashed!")
-
-    # --- Act & Assert ---
-    with pytest.raises(RuntimeError, match="Diarization crashed!"):
-        engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
-
-    # Verify calls up to failure point
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect the Path object
-    mock_diar_model.assert_called_once_with(str(wav_path))
-
-    # Verify ASR was NOT called
-    assert mock_asr_model is not None and not mock_asr_model.transcribe.called
-
-    # Verify temp dir cleanup still happened
-    mock_temp_dir_instance.cleanup.assert_called_once()
-    mock_print.assert_called()
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@pytest.mark.usefixtures("mock_models") # Needs mocked ASR model
-def test_transcribe_asr_failure(
-    mock_convert: mock.MagicMock, # Decorator 3
-    mock_tempfile: mock.MagicMock, # Decorator 2
-    mock_print: mock.MagicMock, # Decorator 1
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Autouse fixture from conftest handles reset and models
+    transcribe_env.temp_instance.cleanup.assert_called_once()
+
+@pytest.mark.parametrize(
+    "stage, exc_msg, expect_diar_called, expect_asr_called",
+    [
+        ("convert", "Conversion failed!", False, False),
+        ("diar", "Diarization crashed!", True, False),
+        ("asr", "ASR crashed!", True, True),
+    ],
+    ids=["convert", "diar", "asr"],
+)
+@pytest.mark.usefixtures("mock_models") # Needs mocked diarization and ASR models
+def test_transcribe_stage_failure(
+    transcribe_mocks: SimpleNamespace,
+    transcribe_env: SimpleNamespace,
+    make_annotation: Callable[..., mock.MagicMock],
+    tmp_path,
+    stage: str,
+    exc_msg: str,
+    expect_diar_called: bool,
+    expect_asr_called: bool,
 ) -> None:
-    """Test transcribe handles failure during the ASR transcribe step.
-    Originally from test_engine.py line 613.
+    """Test transcribe handles a failure in the convert, diarization or ASR step.
+    Replaces the separate _conversion_failure/_diarization_failure/_asr_failure
+    tests originally from test_engine.py lines 526, 565 and 613.
     """
     # --- Arrange ---
-    input_path = pathlib.Path("input.mkv")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
+    wav_path = transcribe_env.make_wav(_INPUT_PATH)
 
     # Get mock models from cache (populated by fixture)
     mock_diar_model = engine._cached_models['diarization']
     mock_asr_model = engine._cached_models['asr']
 
-    # Setup successful diarization (create mock annotation directly)
-    mock_annotation = mock.MagicMock(spec=Annotation)
-    mock_segments = [
-        (Segment(0.0, 1.0), 'track1', 'SPK_0'),
-        (Segment(1.5, 2.5), 'track2', 'SPK_1'),
-    ]
-    mock_annotation.itertracks.return_value = mock_segments
-    mock_diar_model.return_value = mock_annotation
-
-    # Setup ASR to fail
-    mock_asr_model.transcribe.side_effect = RuntimeError("ASR crashed!")
+    # Make the requested stage fail; earlier stages succeed
+    error = RuntimeError(exc_msg)
+    if stage == "convert":
+        transcribe_mocks.convert.side_effect = error
+    elif stage == "diar":
+        mock_diar_model.side_effect = error
+    else:
+        mock_diar_model.return_value = make_annotation([
+            (Segment(0.0, 1.0), 'track1', 'SPK_0'),
+            (Segment(1.5, 2.5), 'track2', 'SPK_1'),
+        ])
+        mock_asr_model.transcribe.side_effect = error
 
     # --- Act & Assert ---
-    with pytest.raises(RuntimeError, match="ASR crashed!"):
-        engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
+    with pytest.raises(RuntimeError, match=exc_msg):
+        engine.transcribe(_INPUT_PATH, models_dir=tmp_path, asr_params={})
 
     # Verify calls up to failure point
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect Path object
-    mock_diar_model.assert_called_once_with(str(wav_path))
-    mock_asr_model.transcribe.assert_called_once_with(
-        str(wav_path),
-        mode="attention_rescoring",
-        beam_size=10,
-        length_penalty=0.0,
-        ctc_weight=0.1,
-        reverse_weight=0.0,
-        blank_penalty=0.0,
-        verbatimicity=1.0,
-        format="ctm"
-    )
+    transcribe_mocks.tempdir.assert_called_once()
+    transcribe_mocks.convert.assert_called_once_with(_INPUT_PATH, output_dir=transcribe_env.temp_dir) # Expect the Path object
+    if expect_diar_called:
+        mock_diar_model.assert_called_once_with(str(wav_path))
+    else:
+        mock_diar_model.assert_not_called()
+    if expect_asr_called:
+        mock_asr_model.transcribe.assert_called_once_with(str(wav_path), **_DEFAULT_ASR_KWARGS)
+    else:
+        mock_asr_model.transcribe.assert_not_called()
 
     # Verify temp dir cleanup still happened
-    mock_temp_dir_instance.cleanup.assert_called_once()
-    mock_print.assert_called()
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@mock.patch('reverb_gui.pipeline.engine.IntervalTree')
-@mock.patch('collections.defaultdict')
-@mock.patch('reverb_gui.pipeline.engine.speaker_for_word')
+    transcribe_env.temp_instance.cleanup.assert_called_once()
+
 @pytest.mark.usefixtures("mock_models") # Needs mocked models
 def test_transcribe_empty_ctm(
-    # Correct parameter order
-    mock_speaker_helper: mock.MagicMock,
-    mock_defaultdict: mock.MagicMock,
-    mock_interval_tree: mock.MagicMock,
-    mock_convert: mock.MagicMock,
-    mock_tempfile: mock.MagicMock,
-    mock_print: mock.MagicMock,
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Autouse fixture handles reset/models
+    transcribe_mocks: SimpleNamespace,
+    transcribe_env: SimpleNamespace,
+    make_annotation: Callable[..., mock.MagicMock],
+    tmp_path,
+    capsys: pytest.CaptureFixture[str],
 ) -> None:
     """Test transcribe handles an empty CTM result from ASR.
     Originally from test_engine.py line 667.
     """
     # --- Arrange ---
-    input_path = pathlib.Path("input.mp3")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
+    wav_path = transcribe_env.make_wav(_INPUT_PATH)
 
     mock_diar_model = engine._cached_models['diarization']
     mock_asr_model = engine._cached_models['asr']
 
-    # Successful diarization (create mock annotation directly)
-    mock_annotation = mock.MagicMock(spec=Annotation)
-    mock_segments = [
+    # Successful diarization
+    mock_diar_model.return_value = make_annotation([
         (Segment(0.0, 5.0), 'track1', 'SPK_0'),
-    ]
-    mock_annotation.itertracks.return_value = mock_segments
-    mock_diar_model.return_value = mock_annotation
+    ])
 
     # ASR returns empty CTM
     mock_asr_model.transcribe.return_value = ""
 
     # Mock speaker helper (should not be called if CTM is empty)
-    # Define side effect based on expected calls
-    def speaker_side_effect(start, duration, tree):
-        return "UNKNOWN" # Fallback
-    mock_speaker_helper.side_effect = speaker_side_effect
+    transcribe_mocks.speaker_for_word.return_value = "UNKNOWN"
 
     # --- Act ---
-    result = engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
+    result = engine.transcribe(_INPUT_PATH, models_dir=tmp_path, asr_params={})
 
     # --- Assert ---
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect Path object
+    transcribe_mocks.tempdir.assert_called_once()
+    transcribe_mocks.convert.assert_called_once_with(_INPUT_PATH, output_dir=transcribe_env.temp_dir) # Expect Path object
     mock_diar_model.assert_called_once_with(str(wav_path))
-    mock_asr_model.transcribe.assert_called_once_with(
-        str(wav_path),
-        mode="attention_rescoring",
-        beam_size=10,
-        length_penalty=0.0,
-        ctc_weight=0.1,
-        reverse_weight=0.0,
-        blank_penalty=0.0,
-        verbatimicity=1.0,
-        format="ctm"
-    )
+    mock_asr_model.transcribe.assert_called_once_with(str(wav_path), **_DEFAULT_ASR_KWARGS)
 
     # Speaker helper should not be called for empty CTM
-    mock_speaker_helper.assert_not_called()
+    transcribe_mocks.speaker_for_word.assert_not_called()
 
     # Result should be empty list
     assert result == []
 
     # Verify temp dir cleanup still happened
-    mock_temp_dir_instance.cleanup.assert_called_once()
+    transcribe_env.temp_instance.cleanup.assert_called_once()
     # Check for warning print about empty CTM
-    mock_print.assert_any_call("Warning: ASR returned empty CTM.")
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@mock.patch('reverb_gui.pipeline.engine.IntervalTree')
-@mock.patch('collections.defaultdict')
-@mock.patch('reverb_gui.pipeline.engine.speaker_for_word')
+    assert "Warning: ASR returned empty CTM." in capsys.readouterr().out
+
 @pytest.mark.usefixtures("mock_models") # Needs mocked models
 def test_transcribe_empty_diarization(
-    # Correct parameter order
-    mock_speaker_helper: mock.MagicMock,
-    mock_defaultdict: mock.MagicMock,
-    mock_interval_tree: mock.MagicMock,
-    mock_convert: mock.MagicMock,
-    mock_tempfile: mock.MagicMock,
-    mock_print: mock.MagicMock,
-    tmp_path, # Add tmp_path fixture
-    # monkeypatch # Autouse fixture handles reset/models
+    transcribe_mocks: SimpleNamespace,
+    transcribe_env: SimpleNamespace,
+    make_annotation: Callable[..., mock.MagicMock],
+    tmp_path,
+    capsys: pytest.CaptureFixture[str],
 ) -> None:
     """Test transcribe handles empty results from diarization.
     Originally from test_engine.py line 734.
     """
     # --- Arrange ---
-    input_path = pathlib.Path("input.ogg")
-    temp_dir_path = pathlib.Path("/fake/temp/dir")
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Mock the .name attribute of the TemporaryDirectory instance
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
+    wav_path = transcribe_env.make_wav(_INPUT_PATH)
 
     mock_diar_model = engine._cached_models['diarization']
     mock_asr_model = engine._cached_models['asr']
 
-    # Empty diarization result (mock Annotation with empty itertracks)
-    mock_annotation = mock.MagicMock()
-    mock_annotation.itertracks.return_value = [] # Return empty list
-    mock_annotation.__bool__ = lambda _: False # Accept self argument (ignored)
-    mock_diar_model.return_value = mock_annotation
+    # Empty diarization result (falsy mock Annotation with empty itertracks)
+    mock_diar_model.return_value = make_annotation([])
 
     # Successful ASR with some words
-    sample_ctm_output = (
-        f"{wav_path.stem} 1 0.50 0.30 hello 1.00\n"
-        f"{wav_path.stem} 1 1.20 0.40 world 0.95\n"
-    )
-    mock_asr_model.transcribe.return_value = sample_ctm_output
+    mock_asr_model.transcribe.return_value = _ctm(wav_path.stem, _TWO_WORD_ROWS)
 
-    # Speaker helper should return UNKNOWN because tree is empty
-    mock_speaker_helper.return_value = "UNKNOWN"
+    # Speaker helper should return UNKNOWN because index is empty
+    transcribe_mocks.speaker_for_word.return_value = "UNKNOWN"
 
     # --- Act ---
-    result = engine.transcribe(input_path, models_dir=tmp_path, asr_params={})
+    result = engine.transcribe(_INPUT_PATH, models_dir=tmp_path, asr_params={})
 
     # --- Assert ---
-    mock_tempfile.assert_called_once()
-    mock_convert.assert_called_once_with(input_path, output_dir=temp_dir_path) # Expect Path object
+    transcribe_mocks.tempdir.assert_called_once()
+    transcribe_mocks.convert.assert_called_once_with(_INPUT_PATH, output_dir=transcribe_env.temp_dir) # Expect Path object
     mock_diar_model.assert_called_once_with(str(wav_path))
-    mock_interval_tree.assert_called_once()
-    mock_interval_tree.return_value.add.assert_not_called() # Tree should be empty
-
-    mock_asr_model.transcribe.assert_called_once_with(
-        str(wav_path),
-        mode="attention_rescoring",
-        beam_size=10,
-        length_penalty=0.0,
-        ctc_weight=0.1,
-        reverse_weight=0.0,
-        blank_penalty=0.0,
-        verbatimicity=1.0,
-        format="ctm"
-    )
+    transcribe_mocks.speaker_index.from_segments.assert_called_once_with([]) # Index should be empty
+
+    mock_asr_model.transcribe.assert_called_once_with(str(wav_path), **_DEFAULT_ASR_KWARGS)
 
     # Speaker helper should be called for each word, returning UNKNOWN
-    expected_speaker_calls = [
-        mock.call(0.50, 0.30, mock_interval_tree.return_value),
-        mock.call(1.20, 0.40, mock_interval_tree.return_value),
+    index = transcribe_mocks.speaker_index.from_segments.return_value
+    expected_speaker_args = [
+        (0.50, 0.30, index),
+        (1.20, 0.40, index),
     ]
-    mock_speaker_helper.assert_has_calls(expected_speaker_calls)
+    assert [c.args for c in transcribe_mocks.speaker_for_word.call_args_list] == expected_speaker_args
 
     # Expect result with UNKNOWN speakers
     expected_result = [
-        (0.50, 0.80, "UNKNOWN", "hello"),
-        (1.20, 1.60, "UNKNOWN", "world"),
+        Word(0.50, 0.80, "UNKNOWN", "hello"),
+        Word(1.20, 1.60, "UNKNOWN", "world"),
     ]
-    assert result == expected_result
+    assert [Word(*row) for row in result] == expected_result
 
     # Verify temp dir cleanup still happened
-    mock_temp_dir_instance.cleanup.assert_called_once()
+    transcribe_env.temp_instance.cleanup.assert_called_once()
     # Check for warning print about empty diarization
-    mock_print.assert_any_call("Warning: Diarization returned no segments.")
-
-@mock.patch('builtins.print')
-@mock.patch('tempfile.TemporaryDirectory')
-@mock.patch('reverb_gui.pipeline.engine.convert_to_wav')
-@mock.patch('reverb_gui.pipeline.engine.IntervalTree') # Needed for diarization part
-@mock.patch('reverb_gui.pipeline.engine.speaker_for_word') # Needed for alignment part
-@pytest.mark.usefixtures("mock_models")
-def test_transcribe_passes_asr_params(
-    mock_speaker_helper: mock.MagicMock, # Decorator 5 (unused but kept for order)
-    mock_interval_tree: mock.MagicMock, # Decorator 4: IntervalTree (instance needed for call)
-    mock_convert: mock.MagicMock,       # Decorator 3
-    mock_tempfile: mock.MagicMock,      # Decorator 2
-    mock_print: mock.MagicMock,         # Decorator 1
-    tmp_path # tmp_path fixture
-    # mock_models fixture is applied via decorator
-) -> None:
-    """Verify that asr_params are correctly unpacked and passed to asr_model.transcribe."""
-    # --- Arrange ---
-    input_path = tmp_path / "test_input.mp3"
-    input_path.touch() # Create dummy file
-    models_dir = tmp_path / "models"
-    models_dir.mkdir()
-    temp_dir_path = tmp_path / "temp_transcribe"
-    wav_path = temp_dir_path / f"{input_path.stem}.wav"
-
-    # Mock temp dir creation
-    mock_temp_dir_instance = mock.MagicMock()
-    mock_temp_dir_instance.name = str(temp_dir_path)
-    mock_tempfile.return_value = mock_temp_dir_instance
-
-    mock_convert.return_value = wav_path
-
-    # Mock IntervalTree instance and its methods if necessary for diarization part
-    mock_tree_instance = mock.MagicMock()
-    mock_interval_tree.return_value = mock_tree_instance
-
-    # Mock speaker assignment (return dummy speaker)
-    mock_speaker_helper.return_value = "SPK_X"
-
-    # Get mocked models from the fixture-populated cache
-    mock_asr_model = engine._cached_models['asr']
-    mock_diar_model = engine._cached_models['diarization']
-    # Mock ASR output (simple CTM format)
-    mock_asr_model.transcribe.return_value = "1 /fake/audio.wav 1 0.1 0.5 hello\n1 /fake/audio.wav 1 0.7 0.4 world"
-    # Mock Diarization output (can use helper from conftest)
-    mock_diar_model.return_value = create_empty_mock_annotation() # Ensure it runs
-
-    # Define specific non-default ASR parameters to test
-    test_asr_params: Dict[str, Any] = {
-        "mode": "attention",        # Non-default
-        "beam_size": 5,             # Non-default
-        "length_penalty": -0.5,     # Non-default
-        "ctc_weight": 0.8,          # Non-default
-        "reverse_weight": 0.3,      # Non-default
-        "blank_penalty": 1.5,       # Non-default
-        "verbatimicity": 0.2,       # Non-default
-    }
-
-    # --- Act --- 
-    # Call transcribe with the specific parameters
-    engine.transcribe(input_path, models_dir, asr_params=test_asr_params)
-
-    # --- Assert --- 
-    # Verify asr_model.transcribe was called with the exact parameters provided
-    mock_asr_model.transcribe.assert_called_once_with(
-        str(wav_path),
-        # --- Check against test_asr_params values --- 
-        mode=test_asr_params["mode"],
-        beam_size=test_asr_params["beam_size"],
-        length_penalty=test_asr_params["length_penalty"],
-        ctc_weight=test_asr_params["ctc_weight"],
-        reverse_weight=test_asr_params["reverse_weight"],
-        blank_penalty=test_asr_params["blank_penalty"],
-        verbatimicity=test_asr_params["verbatimicity"],
-        # --- Check fixed parameter --- 
-        format="ctm" # Ensure the fixed format is still passed
-    )
-
-    # Verify cleanup happened
+    assert "Warning: Diarization returned no segments." in capsys.readouterr().out
@@ -7,7 +7,7 @@ import pytest
 from reverb_gui import main
 
 
-def test_launch_gui_success() -> None:
+def test_launch_gui_success(mocker) -> None:
     """Test launch_gui successfully launches the GUI when models are found."""
     # Arrange
     fake_models_path = pathlib.Path("/fake/models")
@@ -15,31 +15,28 @@ def test_launch_gui_success() -> None:
     mock_qapplication_instance = mock.MagicMock()
     mock_qapplication_instance.exec.return_value = 0 # Simulate normal exit
 
-    # Mock dependencies
-    mock_ensure_models = mock.patch('reverb_gui.main.ensure_models_are_downloaded', return_value=fake_models_path)
-    mock_sys_exit = mock.patch('sys.exit')
-    mock_print = mock.patch('builtins.print')
-    mock_qapplication = mock.patch('reverb_gui.main.QApplication', return_value=mock_qapplication_instance)
+    # Mock dependencies (mocker undoes every patch at teardown)
+    m_ensure = mocker.patch('reverb_gui.main.ensure_models_are_downloaded', return_value=fake_models_path)
+    m_exit = mocker.patch('sys.exit')
+    m_print = mocker.patch('builtins.print')
 
-    # Mock the deferred MainWindow import using sys.modules
+    # Mock the deferred QApplication and MainWindow imports using sys.modules
+    mock_qtwidgets_module = mock.MagicMock()
+    m_qapp = mock.MagicMock(return_value=mock_qapplication_instance)
+    mock_qtwidgets_module.QApplication = m_qapp
     mock_mainwindow_module = mock.MagicMock()
-    mock_mainwindow_module.MainWindow.return_value = mock_main_window_instance
     # Ensure the module mock has a MainWindow attribute that is a class/callable mock
     mock_mainwindow_class = mock.MagicMock(return_value=mock_main_window_instance)
     mock_mainwindow_module.MainWindow = mock_mainwindow_class
 
-    # Patch sys.modules to inject the mock before the import happens in launch_gui
-    mock_sys_modules = mock.patch.dict(sys.modules, {'reverb_gui.gui.mainwindow': mock_mainwindow_module})
+    # Patch sys.modules to inject the mocks before the imports happen in launch_gui
+    mocker.patch.dict(sys.modules, {
+        'PySide6.QtWidgets': mock_qtwidgets_module,
+        'reverb_gui.gui.mainwindow': mock_mainwindow_module,
+    })
 
-    # Start mocks
-    with mock_ensure_models as m_ensure, \
-         mock_sys_exit as m_exit, \
-         mock_print as m_print, \
-         mock_qapplication as m_qapp, \
-         mock_sys_modules:
-
-        # Act
-        main.launch_gui()
+    # Act
+    main.launch_gui()
 
     # Assert
     m_ensure.assert_called_once() # Check models were ensured
@@ -53,26 +50,23 @@ def test_launch_gui_success() -> None:
     m_exit.assert_called_once_with(0) # Check sys.exit called with the result of app.exec
 
 
-def test_launch_gui_fail_models_missing() -> None:
+def test_launch_gui_fail_models_missing(mocker) -> None:
     """Test launch_gui exits gracefully when models are missing."""
     # Arrange
-    mock_ensure_models = mock.patch('reverb_gui.main.ensure_models_are_downloaded', return_value=None)
-    mock_print = mock.patch('builtins.print') # Keep print mock for assertions
-    mock_qapplication = mock.patch('reverb_gui.main.QApplication') # Keep QApplication mock for assertions
-    # No need to mock MainWindow import here as it shouldn't happen
+    m_ensure = mocker.patch('reverb_gui.main.ensure_models_are_downloaded', return_value=None)
+    m_print = mocker.patch('builtins.print') # Keep print mock for assertions
+    # Snapshot sys.modules (restored at teardown) and drop any Qt loaded by earlier tests
+    mocker.patch.dict(sys.modules)
+    sys.modules.pop('PySide6.QtWidgets', None)
+    # No need to mock QApplication or MainWindow imports here as they shouldn't happen
 
-    # Start mocks
-    with mock_ensure_models as m_ensure, \
-         mock_print as m_print, \
-         mock_qapplication as m_qapp:
-
-        # Act & Assert: Expect SystemExit(1)
-        with pytest.raises(SystemExit) as excinfo:
-            main.launch_gui()
+    # Act & Assert: Expect SystemExit(1)
+    with pytest.raises(SystemExit) as excinfo:
+        main.launch_gui()
 
     # Assertions after the expected exit
     assert excinfo.value.code == 1 # Check the exit code
     m_ensure.assert_called_once()
     m_print.assert_any_call("\nFatal Error: Required models could not be verified or downloaded.")
     m_print.assert_any_call("Exiting application.")
-    m_qapp.assert_not_called() # Ensure GUI wasn't initialized
+    assert 'PySide6.QtWidgets' not in sys.modules # Ensure Qt was never imported
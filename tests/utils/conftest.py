@@ -0,0 +1,28 @@
+from unittest import mock
+
+import pytest
+
+from reverb_gui.utils import model_downloader
+
+# Settings model_downloader reads from the environment (or from a loaded .env file)
+_ISOLATED_ENV_VARS = (
+    model_downloader.ENV_MODELS_DIR,
+    model_downloader.ENV_HF_TOKEN,
+    model_downloader.ENV_DOWNLOAD_WORKERS,
+    model_downloader.ENV_MODEL_TTL,
+    model_downloader.ENV_HF_OFFLINE,
+)
+
+@pytest.fixture(autouse=True)
+def mock_load_dotenv(monkeypatch):
+    """Isolate every test from the developer's environment and .env file.
+
+    Clears each setting model_downloader reads and replaces dotenv.load_dotenv
+    with a mock (yielded, so tests can assert on it). The module loads .env at
+    import, so tests that exercise that load re-run it with importlib.reload
+    under this patch. Tests opt into a setting with monkeypatch.setenv.
+    """
+    for name in _ISOLATED_ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+    with mock.patch('dotenv.load_dotenv') as mocked:
+        yield mocked
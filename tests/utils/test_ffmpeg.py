@@ -1,6 +1,9 @@
+import io
 import pytest
 import pathlib
 import subprocess
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type
 from unittest import mock
 import os
 
@@ -8,6 +11,12 @@ import os
 from reverb_gui.utils import ffmpeg
 
 
+@pytest.fixture(autouse=True)
+def clear_ffmpeg_availability_cache(monkeypatch):
+    """Ensures each test sees a fresh (uncached) check_ffmpeg_availability result."""
+    monkeypatch.setattr(ffmpeg, '_FFMPEG_AVAILABLE', False)
+
+
 # --- Tests for check_ffmpeg_availability --- #
 
 @mock.patch('reverb_gui.utils.ffmpeg.shutil.which') # Patch within the module namespace
@@ -39,280 +48,444 @@ def test_check_ffmpeg_availability_not_found(mock_which: mock.MagicMock) -> None
     mock_which.assert_called_once_with(ffmpeg.FFMPEG_CMD)
 
 
-# --- Tests for convert_to_wav --- #
-
-@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
-@mock.patch('reverb_gui.utils.ffmpeg.tempfile.mkdtemp')
-@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_success_temp_dir(
-    mock_check_ffmpeg: mock.MagicMock,
-    mock_mkdtemp: mock.MagicMock,
-    mock_subprocess_run: mock.MagicMock
+@mock.patch('reverb_gui.utils.ffmpeg.os.access', return_value=True) # Independent of mount/exec bits
+@mock.patch('reverb_gui.utils.ffmpeg.shutil.which') # Patch within the module namespace
+def test_check_ffmpeg_availability_absolute_path(
+    mock_which: mock.MagicMock,
+    mock_access: mock.MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
 ) -> None:
-    """Test convert_to_wav successful execution using a temporary directory."""
+    """Test an absolute, executable FFMPEG_CMD is accepted without a PATH search."""
     # Arrange
-    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.touch()
+    monkeypatch.setattr(ffmpeg, 'FFMPEG_CMD', str(fake_ffmpeg))
 
-    # Mock input path object manually
-    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
-    mock_input_path_instance.is_file.return_value = True
-    mock_input_path_instance.stem = "test_audio"
+    # Act
+    result = ffmpeg.check_ffmpeg_availability()
 
-    # Mock tempfile.mkdtemp
-    fake_temp_dir_str = "/fake/temp/dir"
-    mock_mkdtemp.return_value = fake_temp_dir_str
+    # Assert
+    assert result is True
+    mock_access.assert_called_once_with(str(fake_ffmpeg), os.X_OK)
+    mock_which.assert_not_called() # Fast path skips shutil.which
 
-    # Mock the Path objects that will be created inside the function
-    mock_output_dir_instance = mock.MagicMock(spec=pathlib.Path)
-    mock_output_wav_instance = mock.MagicMock(spec=pathlib.Path)
 
-    # Mock subprocess success
-    mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr="")
+@mock.patch('reverb_gui.utils.ffmpeg.shutil.which') # Patch within the module namespace
+def test_check_ffmpeg_availability_cached(mock_which: mock.MagicMock) -> None:
+    """Test repeated availability checks only look up the command once."""
+    # Arrange
+    mock_which.return_value = '/usr/bin/ffmpeg' # Simulate ffmpeg found
+
+    # Act
+    results = [ffmpeg.check_ffmpeg_availability() for _ in range(3)]
 
-    # Use context manager to mock Path constructor specifically for the temp dir path
-    with mock.patch('reverb_gui.utils.ffmpeg.pathlib.Path') as mock_path_cls_local:
+    # Assert
+    assert results == [True, True, True]
+    mock_which.assert_called_once_with(ffmpeg.FFMPEG_CMD) # Later calls hit the cache
 
-        def path_constructor_side_effect(*args, **kwargs):
-            # This will be called like Path("/fake/temp/dir")
-            if args == (fake_temp_dir_str,):
-                return mock_output_dir_instance
-            # We pass the mocked input instance directly, so Path() shouldn't be called for it.
-            # Raise error for any other unexpected Path() calls
-            raise ValueError(f"Unexpected Path constructor call: {args}")
 
-        mock_path_cls_local.side_effect = path_constructor_side_effect
-        # Configure the mock returned by Path(fake_temp_dir_str)
-        mock_output_dir_instance.__truediv__.return_value = mock_output_wav_instance
+@mock.patch('reverb_gui.utils.ffmpeg.shutil.which') # Patch within the module namespace
+def test_check_ffmpeg_availability_failure_not_cached(mock_which: mock.MagicMock) -> None:
+    """Test a failed check is retried, so FFmpeg installed later is picked up."""
+    # Arrange: not found at first, then found (e.g. after the user fixes PATH)
+    mock_which.side_effect = [None, '/usr/bin/ffmpeg']
 
-        # Act
-        result_path = ffmpeg.convert_to_wav(mock_input_path_instance) # Pass the mocked input instance
+    # Act
+    results = [ffmpeg.check_ffmpeg_availability() for _ in range(3)]
 
     # Assert
-    mock_check_ffmpeg.assert_called_once()
-    mock_input_path_instance.is_file.assert_called_once()
-    mock_mkdtemp.assert_called_once_with(prefix="reverb_gui_ffmpeg_")
-
-    # Assert that Path("/fake/temp/dir") was called
-    mock_path_cls_local.assert_called_once_with(fake_temp_dir_str)
-    # Assert that the '/' operator was used to create the output wav path
-    mock_output_dir_instance.__truediv__.assert_called_once_with(
-        "test_audio_converted_16000hz_16bit_mono.wav"
-    )
-    assert result_path == mock_output_wav_instance # Ensure the final mocked path is returned
+    assert results == [False, True, True]
+    assert mock_which.call_count == 2 # Only the successful result is cached
 
-    # Assert subprocess call
-    expected_cmd = [
-        ffmpeg.FFMPEG_CMD,
-        "-i", str(mock_input_path_instance), # Use the mocked instance
+
+# --- Tests for convert_to_wav --- #
+
+def test_ffmpeg_base_args_16k_s16_mono() -> None:
+    """Pin the shared default flags, since the success tests splice them in."""
+    assert ffmpeg.FFMPEG_BASE_ARGS_16K_S16_MONO == (
         "-vn",
         "-acodec", "pcm_s16le",
         "-ar", "16000",
         "-ac", "1",
         "-y",
         "-loglevel", "error",
-        str(mock_output_wav_instance) # Final output path mock
+    )
+
+
+def _write_wav_outputs(command, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run stand-in that creates every .wav output named in the command."""
+    for arg in command:
+        if arg.endswith(".wav"):
+            pathlib.Path(arg).write_bytes(b"RIFF")
+    return subprocess.CompletedProcess(args=command, returncode=0, stdout="", stderr="")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One convert_to_wav case: the environment it runs in and the expected outcome."""
+    name: str
+    specific_dir: bool = False         # Pass an explicit output_dir (else mkdtemp is used)
+    ffmpeg_ok: bool = True             # check_ffmpeg_availability() result
+    input_is_file: bool = True         # input_path.is_file() result
+    bit_depth: int = 16
+    ffmpeg_stderr: Optional[str] = None # If set, FFmpeg fails with this stderr
+    expected_exc: Optional[Type[Exception]] = None
+    expected_substrs: Tuple[str, ...] = ()
+
+    @property
+    def expect_mkdtemp(self) -> bool:
+        """A temp dir is created only once validation passes and no dir is given."""
+        return self.validation_passes and not self.specific_dir
+
+    @property
+    def validation_passes(self) -> bool:
+        return self.ffmpeg_ok and self.input_is_file and self.bit_depth in (16, 24, 32)
+
+
+CONVERT_SCENARIOS = [
+    Scenario("success_temp_dir"),
+    Scenario("success_specific_dir", specific_dir=True),
+    Scenario("fail_ffmpeg_not_found", ffmpeg_ok=False,
+             expected_exc=FileNotFoundError, expected_substrs=("not found or not executable",)),
+    Scenario("fail_input_not_found", input_is_file=False,
+             expected_exc=FileNotFoundError, expected_substrs=("Input file not found: /fake/input/test_audio.mp3",)),
+    Scenario("fail_ffmpeg_error", ffmpeg_stderr="ffmpeg failed with error",
+             expected_exc=RuntimeError, expected_substrs=("FFmpeg conversion failed", "ffmpeg failed with error")),
+    Scenario("fail_invalid_bit_depth", bit_depth=15,
+             expected_exc=ValueError, expected_substrs=("Unsupported bit depth: 15", "Must be 16, 24, or 32")),
+]
+
+
+def _make_mocked_paths(tmp_path: pathlib.Path, scenario: Scenario) -> Tuple[mock.MagicMock, Optional[pathlib.Path]]:
+    """Builds the mock input path and the output_dir argument for a scenario."""
+    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
+    mock_input_path_instance.is_file.return_value = scenario.input_is_file
+    mock_input_path_instance.stem = "test_audio"
+    mock_input_path_instance.__fspath__.return_value = "/fake/input/test_audio.mp3"
+    mock_input_path_instance.__str__.return_value = "/fake/input/test_audio.mp3" # For error messages
+    output_dir = tmp_path / "specific" if scenario.specific_dir else None # Not created yet
+    return mock_input_path_instance, output_dir
+
+
+@pytest.mark.parametrize("scenario", CONVERT_SCENARIOS, ids=lambda s: s.name)
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
+@mock.patch('reverb_gui.utils.ffmpeg.tempfile.mkdtemp')
+@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
+def test_convert_to_wav(
+    mock_check_ffmpeg: mock.MagicMock,
+    mock_mkdtemp: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock,
+    scenario: Scenario,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test convert_to_wav success and failure paths, one scenario per row.
+    Replaces the separate _success_temp_dir/_success_specific_dir/_fail_* tests.
+    """
+    # Arrange
+    mock_check_ffmpeg.return_value = scenario.ffmpeg_ok
+    mock_input_path_instance, output_dir = _make_mocked_paths(tmp_path, scenario)
+
+    # Mock tempfile.mkdtemp (a real directory, so the output check can see the file)
+    fake_temp_dir_str = str(tmp_path)
+    mock_mkdtemp.return_value = fake_temp_dir_str
+
+    # Mock subprocess: either fail with the scenario's stderr, or write the output file
+    if scenario.ffmpeg_stderr is not None:
+        mock_subprocess_run.side_effect = subprocess.CalledProcessError(
+            returncode=1, cmd=["ffmpeg", "..."], stderr=scenario.ffmpeg_stderr
+        )
+    else:
+        mock_subprocess_run.side_effect = _write_wav_outputs
+
+    # Act & Assert
+    if scenario.expected_exc is not None:
+        with pytest.raises(scenario.expected_exc) as excinfo:
+            ffmpeg.convert_to_wav(mock_input_path_instance, output_dir=output_dir, bit_depth=scenario.bit_depth)
+        for substr in scenario.expected_substrs:
+            assert substr in str(excinfo.value)
+    else:
+        result_path = ffmpeg.convert_to_wav(mock_input_path_instance, output_dir=output_dir, bit_depth=scenario.bit_depth)
+
+    # Assert mocks were called as expected up to the outcome
+    mock_check_ffmpeg.assert_called_once() # The check is always performed first
+    assert mock_input_path_instance.is_file.call_count == int(scenario.ffmpeg_ok)
+    if scenario.expect_mkdtemp:
+        mock_mkdtemp.assert_called_once_with(prefix="reverb_gui_ffmpeg_")
+    else:
+        mock_mkdtemp.assert_not_called()
+    assert mock_subprocess_run.call_count == int(scenario.validation_passes) # FFmpeg only runs after validation
+    if not scenario.validation_passes:
+        return
+
+    # The output path is joined as a string and passed to FFmpeg as the last argument
+    expected_dir_str = str(output_dir) if scenario.specific_dir else fake_temp_dir_str
+    expected_output_str = os.path.join(expected_dir_str, "test_audio_converted_16000hz_16bit_mono.wav")
+    expected_cmd = [
+        ffmpeg.FFMPEG_CMD,
+        "-i", "/fake/input/test_audio.mp3", # os.fspath() of the mocked input
+        *ffmpeg.FFMPEG_BASE_ARGS_16K_S16_MONO, # Default 16 kHz / 16-bit / mono flags
+        expected_output_str
     ]
     mock_subprocess_run.assert_called_once_with(
-        expected_cmd, check=True, capture_output=True, text=True, shell=False
+        expected_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, shell=False
     )
+    if scenario.expected_exc is None:
+        assert result_path == pathlib.Path(expected_output_str) # Wrapped in a Path only on return
+
 
+# --- Tests for decode_to_pcm_bytes --- #
 
 @mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
-# No mkdtemp mock needed here
 @mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_success_specific_dir(
+def test_decode_to_pcm_bytes_success(
     mock_check_ffmpeg: mock.MagicMock,
     mock_subprocess_run: mock.MagicMock
 ) -> None:
-    """Test convert_to_wav successful execution using a specific output directory."""
+    """Test decode_to_pcm_bytes returns FFmpeg's stdout without writing a file."""
     # Arrange
     mock_check_ffmpeg.return_value = True # FFmpeg is available
 
     # Mock input path object manually
     mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
     mock_input_path_instance.is_file.return_value = True
-    mock_input_path_instance.stem = "test_specific"
-
-    # Mock the specific output directory path object passed as argument
-    mock_specific_output_dir_arg = mock.MagicMock(spec=pathlib.Path)
-
-    # Mock the Path objects that will be created inside the function
-    mock_output_dir_instance_internal = mock.MagicMock(spec=pathlib.Path)
-    mock_output_wav_instance = mock.MagicMock(spec=pathlib.Path)
 
-    # Mock subprocess success
-    mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr="")
+    # Mock subprocess success with raw PCM on stdout
+    fake_pcm = b"\x00\x01\x02\x03"
+    mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout=fake_pcm, stderr=b"")
 
-    # Use context manager to mock Path constructor
-    with mock.patch('reverb_gui.utils.ffmpeg.pathlib.Path') as mock_path_cls_local:
-
-        def path_side_effect(*args, **kwargs):
-            # Path(output_dir) where output_dir is the argument
-            if args == (mock_specific_output_dir_arg,):
-                return mock_output_dir_instance_internal
-            # Other calls are not expected
-            raise ValueError(f"Unexpected Path constructor call: {args}")
-
-        mock_path_cls_local.side_effect = path_side_effect
-
-        # Configure the mock created internally from the specific dir argument
-        mock_output_dir_instance_internal.mkdir.return_value = None
-        mock_output_dir_instance_internal.__truediv__.return_value = mock_output_wav_instance
-
-        # Act
-        result_path = ffmpeg.convert_to_wav(mock_input_path_instance, output_dir=mock_specific_output_dir_arg)
+    # Act
+    result = ffmpeg.decode_to_pcm_bytes(mock_input_path_instance)
 
     # Assert
-    mock_check_ffmpeg.assert_called_once()
-    mock_input_path_instance.is_file.assert_called_once()
-    mock_path_cls_local.assert_called_once_with(mock_specific_output_dir_arg) # Path(output_dir) called
-    mock_output_dir_instance_internal.mkdir.assert_called_once_with(parents=True, exist_ok=True)
-    mock_output_dir_instance_internal.__truediv__.assert_called_once_with(
-        "test_specific_converted_16000hz_16bit_mono.wav"
-    )
-    assert result_path == mock_output_wav_instance
-
-    # Assert subprocess call (uses the final mock wav path)
+    assert result == fake_pcm
     expected_cmd = [
         ffmpeg.FFMPEG_CMD,
         "-i", str(mock_input_path_instance),
         "-vn",
-        "-acodec", "pcm_s16le",
-        "-ar", "16000",
         "-ac", "1",
-        "-y",
+        "-ar", "16000",
+        "-f", "s16le",
         "-loglevel", "error",
-        str(mock_output_wav_instance)
+        "pipe:1"
     ]
     mock_subprocess_run.assert_called_once_with(
-        expected_cmd, check=True, capture_output=True, text=True, shell=False
+        expected_cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=False, shell=False
     )
 
 
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
 @mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_fail_ffmpeg_not_found(
+def test_decode_to_pcm_bytes_fail_ffmpeg_error(
     mock_check_ffmpeg: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock
 ) -> None:
-    """Test convert_to_wav raises FileNotFoundError when FFmpeg is not available."""
+    """Test decode_to_pcm_bytes raises RuntimeError with decoded stderr on failure."""
     # Arrange
-    mock_check_ffmpeg.return_value = False # FFmpeg is NOT available
-    mock_input_path = mock.MagicMock(spec=pathlib.Path) # Dummy input path
+    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
+    mock_input_path_instance.is_file.return_value = True
+    mock_subprocess_run.side_effect = subprocess.CalledProcessError(
+        returncode=1, cmd=["ffmpeg", "..."], stderr=b"decode failed"
+    )
 
     # Act & Assert
-    with pytest.raises(FileNotFoundError) as excinfo: # Expect FileNotFoundError
-        ffmpeg.convert_to_wav(mock_input_path)
+    with pytest.raises(RuntimeError) as excinfo:
+        ffmpeg.decode_to_pcm_bytes(mock_input_path_instance)
+    assert "decode failed" in str(excinfo.value) # Bytes stderr is decoded into the message
 
-    # Assert correct exception message
-    assert "not found or not executable" in str(excinfo.value) # Check new message substring
 
-    mock_check_ffmpeg.assert_called_once() # Ensure the check was performed
+def _make_mock_popen(stdout_data: bytes, returncode: int) -> mock.MagicMock:
+    """Builds a mock Popen instance whose stdout streams stdout_data."""
+    mock_proc = mock.MagicMock()
+    mock_proc.stdout = io.BytesIO(stdout_data)
+    mock_proc.wait.return_value = returncode
+    mock_proc.poll.return_value = returncode # Process has exited
+    return mock_proc
 
 
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.Popen')
 @mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_fail_input_not_found(
+def test_stream_decode_to_pcm_pipes_chunks(
     mock_check_ffmpeg: mock.MagicMock,
+    mock_popen: mock.MagicMock
 ) -> None:
-    """Test convert_to_wav raises FileNotFoundError when input file does not exist."""
+    """Test stream_decode_to_pcm yields FFmpeg's stdout in chunk_size pieces."""
     # Arrange
     mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
+    mock_input_path_instance.is_file.return_value = True
+    mock_popen.return_value = _make_mock_popen(b"abcdefghij", returncode=0)
+
+    # Act
+    chunks = list(ffmpeg.stream_decode_to_pcm(mock_input_path_instance, chunk_size=4))
 
-    mock_input_path = mock.MagicMock(spec=pathlib.Path)
-    mock_input_path.is_file.return_value = False # Input file does *not* exist
-    mock_input_path.__str__.return_value = "/fake/nonexistent/input.mp3" # For error message
+    # Assert
+    assert chunks == [b"abcd", b"efgh", b"ij"]
+    assert mock_popen.call_args.args[0][-1] == "pipe:1" # PCM is read from stdout
+    mock_popen.return_value.kill.assert_not_called()
+
+
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.Popen')
+@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
+def test_stream_decode_to_pcm_fail_ffmpeg_error(
+    mock_check_ffmpeg: mock.MagicMock,
+    mock_popen: mock.MagicMock
+) -> None:
+    """Test stream_decode_to_pcm raises RuntimeError once FFmpeg exits non-zero."""
+    # Arrange
+    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
+    mock_input_path_instance.is_file.return_value = True
+    mock_popen.return_value = _make_mock_popen(b"abcd", returncode=1)
 
     # Act & Assert
-    with pytest.raises(FileNotFoundError) as excinfo:
-        ffmpeg.convert_to_wav(mock_input_path)
+    stream = ffmpeg.stream_decode_to_pcm(mock_input_path_instance, chunk_size=4)
+    assert next(stream) == b"abcd" # Data before the failure is still delivered
+    with pytest.raises(RuntimeError, match="FFmpeg conversion failed"):
+        next(stream)
 
-    # Assert correct exception message
-    assert f"Input file not found: {mock_input_path}" in str(excinfo.value)
-    mock_check_ffmpeg.assert_called_once() # Ensure ffmpeg check happened
-    mock_input_path.is_file.assert_called_once() # Ensure file check happened
 
+# --- Tests for convert_many_to_wav --- #
 
+@pytest.mark.parametrize("num_inputs", [1, 3])
 @mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
-@mock.patch('reverb_gui.utils.ffmpeg.tempfile.mkdtemp')
 @mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_fail_ffmpeg_error(
+def test_convert_many_to_wav_single_subprocess(
     mock_check_ffmpeg: mock.MagicMock,
-    mock_mkdtemp: mock.MagicMock,
-    mock_subprocess_run: mock.MagicMock
+    mock_subprocess_run: mock.MagicMock,
+    num_inputs: int,
+    tmp_path: pathlib.Path,
 ) -> None:
-    """Test convert_to_wav raises RuntimeError when the FFmpeg command fails."""
+    """Test convert_many_to_wav converts all inputs with exactly one FFmpeg process."""
     # Arrange
     mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_subprocess_run.side_effect = _write_wav_outputs
+    inputs = [tmp_path / f"clip{i}.mp3" for i in range(num_inputs)]
+    for input_path in inputs:
+        input_path.touch()
+    output_dir = tmp_path / "out"
 
-    # Mock input path object manually
-    mock_input_path_instance = mock.MagicMock(spec=pathlib.Path)
-    mock_input_path_instance.is_file.return_value = True
-    mock_input_path_instance.stem = "test_error"
-    mock_input_path_instance.__str__.return_value = "/fake/input/test_error.mp3"
-
-    # Mock tempfile.mkdtemp
-    fake_temp_dir_str = "/fake/temp/error_dir"
-    mock_mkdtemp.return_value = fake_temp_dir_str
+    # Act
+    result_paths = ffmpeg.convert_many_to_wav(inputs, output_dir=output_dir)
 
-    # Mock the Path objects that will be created inside the function
-    mock_output_dir_instance = mock.MagicMock(spec=pathlib.Path)
-    mock_output_wav_instance = mock.MagicMock(spec=pathlib.Path)
-    mock_output_wav_instance.__str__.return_value = "/fake/temp/error_dir/output.wav" # For error message
+    # Assert
+    assert mock_subprocess_run.call_count == 1 # One process regardless of len(inputs)
+    assert result_paths == [
+        output_dir / f"clip{i}_converted_16000hz_16bit_mono.wav" for i in range(num_inputs)
+    ]
 
-    # Mock subprocess to raise CalledProcessError
-    error_message = "ffmpeg failed with error"
-    mock_subprocess_run.side_effect = subprocess.CalledProcessError(
-        returncode=1, cmd=["ffmpeg", "..."], stderr=error_message
+    # All inputs come first, followed by one output group per input
+    expected_cmd = [ffmpeg.FFMPEG_CMD, "-y", "-loglevel", "error"]
+    for input_path in inputs:
+        expected_cmd += ["-i", str(input_path)]
+    for i, output_path in enumerate(result_paths):
+        expected_cmd += [
+            "-map", f"{i}:a:0",
+            "-vn",
+            "-acodec", "pcm_s16le",
+            "-ar", "16000",
+            "-ac", "1",
+            str(output_path),
+        ]
+    mock_subprocess_run.assert_called_once_with(
+        expected_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, shell=False
     )
 
-    # Use context manager to mock Path constructor
-    with mock.patch('reverb_gui.utils.ffmpeg.pathlib.Path') as mock_path_cls_local:
-        def path_constructor_side_effect(*args, **kwargs):
-            if args == (fake_temp_dir_str,):
-                return mock_output_dir_instance
-            raise ValueError(f"Unexpected Path constructor call: {args}")
 
-        mock_path_cls_local.side_effect = path_constructor_side_effect
-        mock_output_dir_instance.__truediv__.return_value = mock_output_wav_instance
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
+@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
+def test_convert_many_to_wav_fail_duplicate_names(
+    mock_check_ffmpeg: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test convert_many_to_wav rejects inputs whose outputs would collide."""
+    # Arrange
+    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    inputs = [tmp_path / "a" / "clip.mp3", tmp_path / "b" / "clip.mp3"]
+    for input_path in inputs:
+        input_path.parent.mkdir()
+        input_path.touch()
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="distinct names"):
+        ffmpeg.convert_many_to_wav(inputs, output_dir=tmp_path / "out")
+    mock_subprocess_run.assert_not_called() # FFmpeg never started
 
-        # Act & Assert
-        with pytest.raises(RuntimeError) as excinfo:
-            ffmpeg.convert_to_wav(mock_input_path_instance)
 
-    # Assert correct exception message
-    assert "FFmpeg conversion failed" in str(excinfo.value) # Check for new message start
-    assert error_message in str(excinfo.value) # Ensure original stderr is included
+# --- Tests for convert_to_wav_pool --- #
 
-    # Assert mocks were called as expected up to the failure point
-    mock_check_ffmpeg.assert_called_once()
-    mock_input_path_instance.is_file.assert_called_once()
-    mock_mkdtemp.assert_called_once()
-    mock_path_cls_local.assert_called_once_with(fake_temp_dir_str)
-    mock_output_dir_instance.__truediv__.assert_called_once()
-    mock_subprocess_run.assert_called_once() # Ensure ffmpeg was attempted
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
+@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
+def test_convert_to_wav_pool_preserves_order(
+    mock_check_ffmpeg: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test convert_to_wav_pool runs one FFmpeg per input and keeps input order."""
+    # Arrange
+    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_subprocess_run.side_effect = _write_wav_outputs
+    inputs = [tmp_path / f"clip{i}.mp3" for i in range(4)]
+    for input_path in inputs:
+        input_path.touch()
+    output_dir = tmp_path / "out"
 
+    # Act
+    results = ffmpeg.convert_to_wav_pool(inputs, output_dir=output_dir, max_workers=2)
 
+    # Assert
+    assert mock_subprocess_run.call_count == len(inputs) # One process per input
+    assert results == [
+        output_dir / f"clip{i}_converted_16000hz_16bit_mono.wav" for i in range(len(inputs))
+    ]
+
+
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
 @mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
-def test_convert_to_wav_fail_invalid_bit_depth(
+def test_convert_to_wav_pool_reports_failures_per_file(
     mock_check_ffmpeg: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock,
+    tmp_path: pathlib.Path,
 ) -> None:
-    """Test convert_to_wav raises ValueError for invalid bit_depth."""
+    """Test a failing input is reported in place without cancelling the others."""
     # Arrange
     mock_check_ffmpeg.return_value = True # FFmpeg is available
+    mock_subprocess_run.side_effect = _write_wav_outputs
+    inputs = [tmp_path / "ok0.mp3", tmp_path / "missing.mp3", tmp_path / "ok2.mp3"]
+    inputs[0].touch()
+    inputs[2].touch() # inputs[1] deliberately not created
 
-    mock_input_path = mock.MagicMock(spec=pathlib.Path)
-    mock_input_path.is_file.return_value = True # Input file exists
-    mock_input_path.stem = "test_bit_depth"
+    # Act
+    results = ffmpeg.convert_to_wav_pool(inputs, output_dir=tmp_path / "out")
 
-    invalid_bit_depth = 15
+    # Assert
+    assert isinstance(results[1], FileNotFoundError)
+    assert results[0] == tmp_path / "out" / "ok0_converted_16000hz_16bit_mono.wav"
+    assert results[2] == tmp_path / "out" / "ok2_converted_16000hz_16bit_mono.wav"
+    assert mock_subprocess_run.call_count == 2 # Only the existing inputs reached FFmpeg
 
-    # Act & Assert
-    with pytest.raises(ValueError) as excinfo:
-        ffmpeg.convert_to_wav(mock_input_path, bit_depth=invalid_bit_depth)
 
-    # Assert correct exception message
-    assert f"Unsupported bit depth: {invalid_bit_depth}" in str(excinfo.value) # Check actual message
-    assert "Must be 16, 24, or 32" in str(excinfo.value) # Check supported depths
-    mock_check_ffmpeg.assert_called_once() # Ensure ffmpeg check happened
-    mock_input_path.is_file.assert_called_once() # Ensure file check happened
+@mock.patch('reverb_gui.utils.ffmpeg.subprocess.run')
+@mock.patch('reverb_gui.utils.ffmpeg.check_ffmpeg_availability')
+def test_convert_to_wav_pool_fail_duplicate_names(
+    mock_check_ffmpeg: mock.MagicMock,
+    mock_subprocess_run: mock.MagicMock,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test convert_to_wav_pool rejects same-stem inputs sharing an output dir."""
+    # Arrange
+    mock_check_ffmpeg.return_value = True # FFmpeg is available
+    inputs = [tmp_path / "a" / "clip.mp3", tmp_path / "b" / "clip.mp3"]
+    for input_path in inputs:
+        input_path.parent.mkdir()
+        input_path.touch()
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="distinct names"):
+        ffmpeg.convert_to_wav_pool(inputs, output_dir=tmp_path / "out")
+    mock_subprocess_run.assert_not_called() # No FFmpeg process started
 
 
 # Test that FFMPEG_CMD is correctly determined from environment variable
@@ -328,15 +501,6 @@ def test_convert_to_wav_fail_invalid_bit_depth(
         ("ffmpeg_custom_name", "ffmpeg_custom_name"), # Just a name, expect passthrough (not a path)
     ]
 )
-def test_ffmpeg_cmd_from_env(monkeypatch, env_path, expected_cmd):
-    """Verify FFMPEG_CMD uses env var FFMPEG_PATH correctly, normalizing paths."""
-    if env_path is not None:
-        monkeypatch.setenv("FFMPEG_PATH", env_path)
-    else:
-        monkeypatch.delenv("FFMPEG_PATH", raising=False) # Ensure it's not set
-
-    # Reload the ffmpeg module to re-evaluate FFMPEG_CMD with the new env var
-    import importlib
-    importlib.reload(ffmpeg)
-
-    assert ffmpeg.FFMPEG_CMD == expected_cmd
+def test_ffmpeg_cmd_from_env(env_path, expected_cmd):
+    """Verify FFMPEG_PATH values resolve to the right FFMPEG_CMD, normalizing paths."""
+    assert ffmpeg._resolve_ffmpeg_cmd(env_path) == expected_cmd
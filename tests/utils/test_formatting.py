@@ -12,6 +12,7 @@ from reverb_gui.utils.formatting import format_timestamp_ms, format_transcript_l
         (62.22, "00:01:02.220"),
         (3600, "01:00:00.000"),
         (3661.1234, "01:01:01.123"),
+        (59.9996, "00:01:00.000"), # Rounding carries into seconds and minutes
         (-1, "00:00:00.000"), # Handle negative input gracefully
         (None, "00:00:00.000"), # Handle None input gracefully
         ("invalid", "00:00:00.000"), # Handle non-numeric input
@@ -1,13 +1,30 @@
+import importlib
 import os
+import time
 from unittest import mock
 import pathlib # Import pathlib to mock Path
 
+import dotenv
 import pytest # Import pytest for testing
-from huggingface_hub.utils import LocalEntryNotFoundError, HfHubHTTPError # Import exceptions
+from huggingface_hub.utils import HfHubHTTPError # Import exceptions
 
 # Module to test
 from reverb_gui.utils import model_downloader
 
+# Shared fake locations (built once rather than per test)
+FAKE_MODELS_PATH = pathlib.Path('C:/fake/models/dir')
+FAKE_PROJECT_ROOT = pathlib.Path('C:/fake/project/root')
+
+
+@pytest.fixture(autouse=True)
+def clear_model_downloader_caches():
+    """Reset memoized environment lookups so each test re-reads its own setup."""
+    model_downloader._get_hf_token.cache_clear()
+    model_downloader.get_models_dir.cache_clear()
+    yield
+    model_downloader._get_hf_token.cache_clear()
+    model_downloader.get_models_dir.cache_clear()
+
 
 @pytest.mark.parametrize(
     "env_token, expected_token",
@@ -18,10 +35,8 @@ from reverb_gui.utils import model_downloader
     ]
 )
 @mock.patch.dict(os.environ, {}, clear=True) # Start with clean environment for each test case
-@mock.patch('dotenv.load_dotenv') # Mock load_dotenv to prevent loading .env files
-def test_get_hf_token(mock_load_dotenv, env_token: str | None, expected_token: str | None, monkeypatch) -> None:
+def test_get_hf_token(env_token: str | None, expected_token: str | None, monkeypatch) -> None:
     """Test the _get_hf_token function retrieves token from env var."""
-    # mock_load_dotenv is the MagicMock object for the patched function, but we don't need to interact with it here.
     if env_token is not None:
         monkeypatch.setenv("HUGGING_FACE_HUB_TOKEN", env_token)
     else:
@@ -32,15 +47,26 @@ def test_get_hf_token(mock_load_dotenv, env_token: str | None, expected_token: s
     assert token == expected_token
 
 
+def test_get_hf_token_cached(monkeypatch) -> None:
+    """Test _get_hf_token only reads the environment once per process."""
+    monkeypatch.setenv("HUGGING_FACE_HUB_TOKEN", "first_token")
+    assert model_downloader._get_hf_token() == "first_token"
+
+    # Later environment changes are not picked up until the cache is cleared
+    monkeypatch.setenv("HUGGING_FACE_HUB_TOKEN", "second_token")
+    assert model_downloader._get_hf_token() == "first_token"
+
+    model_downloader._get_hf_token.cache_clear()
+    assert model_downloader._get_hf_token() == "second_token"
+
+
 @mock.patch('pathlib.Path.mkdir')
 @mock.patch('reverb_gui.utils.model_downloader._get_project_root')
-@mock.patch('dotenv.load_dotenv')
-def test_get_models_dir_default(mock_load_dotenv: mock.MagicMock,
-                                mock_get_project_root: mock.MagicMock,
+def test_get_models_dir_default(mock_get_project_root: mock.MagicMock,
                                 mock_mkdir: mock.MagicMock) -> None:
     """Test get_models_dir default behavior (REVERB_MODELS_DIR unset)."""
     # Arrange: Configure mock for _get_project_root to return a Windows-absolute path
-    fake_project_root = pathlib.Path('C:/fake/project/root')
+    fake_project_root = FAKE_PROJECT_ROOT
     mock_get_project_root.return_value = fake_project_root
 
     # Arrange: Ensure environment variable is unset (although load_dotenv is mocked anyway)
@@ -64,9 +90,8 @@ def test_get_models_dir_default(mock_load_dotenv: mock.MagicMock,
 
 
 @mock.patch('pathlib.Path.mkdir')
-@mock.patch('dotenv.load_dotenv')
-def test_get_models_dir_env_var_set(mock_load_dotenv: mock.MagicMock,
-                                    mock_mkdir: mock.MagicMock,
+def test_get_models_dir_env_var_set(mock_mkdir: mock.MagicMock,
+                                    mock_load_dotenv: mock.MagicMock,
                                     monkeypatch) -> None:
     """Test get_models_dir when REVERB_MODELS_DIR environment variable is set."""
     # Arrange: Set the environment variable
@@ -83,26 +108,62 @@ def test_get_models_dir_env_var_set(mock_load_dotenv: mock.MagicMock,
     # Assert: Check that mkdir was called correctly on the expected path object
     models_dir.mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
-    # Assert: load_dotenv was called (to ensure it tries reading .env)
-    mock_load_dotenv.assert_called_once()
+    # Assert: .env is loaded once at import, not on every call
+    mock_load_dotenv.assert_not_called()
+
+
+@mock.patch('pathlib.Path.mkdir')
+def test_get_models_dir_cached(mock_mkdir: mock.MagicMock,
+                               tmp_path: pathlib.Path,
+                               monkeypatch) -> None:
+    """Test get_models_dir resolves and creates the directory only once."""
+    monkeypatch.setenv(model_downloader.ENV_MODELS_DIR, str(tmp_path))
+
+    first = model_downloader.get_models_dir()
+    second = model_downloader.get_models_dir()
+
+    assert first == second == tmp_path
+    mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
+
+
+def test_load_dotenv_at_import(mock_load_dotenv: mock.MagicMock, monkeypatch) -> None:
+    """Test the .env file is loaded once when the module is imported."""
+    monkeypatch.delenv(model_downloader.ENV_HF_TRANSFER, raising=False) # Restored after the reload
+    importlib.reload(model_downloader)
+    mock_load_dotenv.assert_called_once_with()
+
+    # Lookups read os.environ directly and never parse .env again
+    model_downloader._get_hf_token()
+    model_downloader._get_download_workers()
+    mock_load_dotenv.assert_called_once_with()
 
 
 # --- Tests for ensure_models_are_downloaded ---
 
-@mock.patch('huggingface_hub.snapshot_download') # Mock the actual download function
-@mock.patch('reverb_gui.utils.model_downloader.check_model_exists') # Mock the helper function
-@mock.patch('reverb_gui.utils.model_downloader._get_hf_token') # Mock getting token
-@mock.patch('reverb_gui.utils.model_downloader.get_models_dir')  # Mock getting models dir path
-def test_ensure_models_downloaded_all_exist(mock_get_models_dir: mock.MagicMock,
-                                           mock_get_hf_token: mock.MagicMock,
-                                           mock_check_model_exists: mock.MagicMock, # Renamed arg
-                                           mock_snapshot_download: mock.MagicMock) -> None:
+@pytest.fixture
+def ensure_mocks():
+    """Patches every collaborator of ensure_models_are_downloaded in one go.
+
+    Yields a dict of the mocks keyed by attribute name.
+    """
+    with mock.patch.multiple(
+        'reverb_gui.utils.model_downloader',
+        snapshot_download=mock.DEFAULT,   # The actual download function
+        download_model=mock.DEFAULT,      # The download helper
+        check_model_exists=mock.DEFAULT,  # The check helper
+        _get_hf_token=mock.DEFAULT,       # Getting the token
+        get_models_dir=mock.DEFAULT,      # Getting the models dir path
+    ) as mocks:
+        yield mocks
+
+
+def test_ensure_models_downloaded_all_exist(ensure_mocks: dict) -> None:
     """Test ensure_models_are_downloaded when all models exist locally."""
     # Arrange: Configure mocks
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
-    mock_get_models_dir.return_value = fake_models_path
-    mock_get_hf_token.return_value = 'fake_token' # Token needed by check_model_exists signature
-    mock_check_model_exists.return_value = True # Simulate the check always passes
+    fake_models_path = FAKE_MODELS_PATH
+    ensure_mocks['get_models_dir'].return_value = fake_models_path
+    ensure_mocks['_get_hf_token'].return_value = 'fake_token' # Token needed by check_model_exists signature
+    ensure_mocks['check_model_exists'].return_value = True # Simulate the check always passes
 
     # Act: Call the function under test
     result_path = model_downloader.ensure_models_are_downloaded()
@@ -111,45 +172,36 @@ def test_ensure_models_downloaded_all_exist(mock_get_models_dir: mock.MagicMock,
     assert result_path == fake_models_path
 
     # Assert: Check required functions were called
-    mock_get_models_dir.assert_called_once()
-    mock_get_hf_token.assert_called_once() # Called once before loop
+    ensure_mocks['get_models_dir'].assert_called_once()
+    ensure_mocks['_get_hf_token'].assert_called_once() # Called once before loop
 
     # Assert: Check check_model_exists was called for each required model
+    mock_check_model_exists = ensure_mocks['check_model_exists']
     assert mock_check_model_exists.call_count == len(model_downloader.REQUIRED_MODELS)
     for model_id in model_downloader.REQUIRED_MODELS:
         # Assert check_model_exists was called with the correct arguments
         mock_check_model_exists.assert_any_call(model_id, fake_models_path, 'fake_token')
 
-    # Assert: snapshot_download should NOT have been called
-    mock_snapshot_download.assert_not_called()
-
-
-@mock.patch('huggingface_hub.snapshot_download')
-@mock.patch('reverb_gui.utils.model_downloader.download_model') # Mock the download helper
-@mock.patch('reverb_gui.utils.model_downloader.check_model_exists') # Mock the check helper
-@mock.patch('reverb_gui.utils.model_downloader._get_hf_token')
-@mock.patch('reverb_gui.utils.model_downloader.get_models_dir')
-def test_ensure_models_downloaded_one_missing(
-    mock_get_models_dir: mock.MagicMock,
-    mock_get_hf_token: mock.MagicMock,
-    mock_check_model_exists: mock.MagicMock,
-    mock_download_model: mock.MagicMock,
-    mock_snapshot_download: mock.MagicMock
-) -> None:
+    # Assert: nothing should have been downloaded
+    ensure_mocks['download_model'].assert_not_called()
+    ensure_mocks['snapshot_download'].assert_not_called()
+
+
+def test_ensure_models_downloaded_one_missing(ensure_mocks: dict) -> None:
     """Test ensure_models_are_downloaded when one model is missing and downloads ok."""
     # Arrange: Setup mocks
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
-    mock_get_models_dir.return_value = fake_models_path
+    fake_models_path = FAKE_MODELS_PATH
+    ensure_mocks['get_models_dir'].return_value = fake_models_path
     fake_token = 'fake_token'
-    mock_get_hf_token.return_value = fake_token
+    ensure_mocks['_get_hf_token'].return_value = fake_token
 
-    # Simulate first model missing, rest exist
+    # Simulate first model missing, rest exist (keyed by model, since checks run concurrently)
     num_models = len(model_downloader.REQUIRED_MODELS)
-    check_side_effects = [False] + [True] * (num_models - 1)
-    mock_check_model_exists.side_effect = check_side_effects
+    missing_model = model_downloader.REQUIRED_MODELS[0]
+    ensure_mocks['check_model_exists'].side_effect = lambda model_id, models_dir, token: model_id != missing_model
 
     # Simulate successful download
-    mock_download_model.return_value = True
+    ensure_mocks['download_model'].return_value = True
 
     # Act: Call the function
     result_path = model_downloader.ensure_models_are_downloaded()
@@ -158,37 +210,30 @@ def test_ensure_models_downloaded_one_missing(
     assert result_path == fake_models_path
 
     # Assert: Correct functions called
-    mock_get_models_dir.assert_called_once()
-    mock_get_hf_token.assert_called_once()
-    assert mock_check_model_exists.call_count == num_models
+    ensure_mocks['get_models_dir'].assert_called_once()
+    ensure_mocks['_get_hf_token'].assert_called_once()
+    assert ensure_mocks['check_model_exists'].call_count == num_models
 
     # Assert: download_model called once for the first model
-    mock_download_model.assert_called_once_with(
+    ensure_mocks['download_model'].assert_called_once_with(
         model_downloader.REQUIRED_MODELS[0],
         fake_models_path,
         fake_token
     )
 
     # Assert: snapshot_download (the low-level func) was not called directly
-    mock_snapshot_download.assert_not_called()
-
-
-@mock.patch('reverb_gui.utils.model_downloader.download_model') # Mock the download helper
-@mock.patch('reverb_gui.utils.model_downloader.check_model_exists') # Mock the check helper
-@mock.patch('reverb_gui.utils.model_downloader._get_hf_token')
-@mock.patch('reverb_gui.utils.model_downloader.get_models_dir')
-def test_ensure_models_downloaded_download_fails(
-    mock_get_models_dir: mock.MagicMock,
-    mock_get_hf_token: mock.MagicMock,
-    mock_check_model_exists: mock.MagicMock,
-    mock_download_model: mock.MagicMock
-) -> None:
+    ensure_mocks['snapshot_download'].assert_not_called()
+
+
+def test_ensure_models_downloaded_download_fails(ensure_mocks: dict) -> None:
     """Test ensure_models_are_downloaded when a model download fails."""
     # Arrange: Setup mocks
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
-    mock_get_models_dir.return_value = fake_models_path
+    fake_models_path = FAKE_MODELS_PATH
+    ensure_mocks['get_models_dir'].return_value = fake_models_path
     fake_token = 'fake_token'
-    mock_get_hf_token.return_value = fake_token
+    ensure_mocks['_get_hf_token'].return_value = fake_token
+    mock_check_model_exists = ensure_mocks['check_model_exists']
+    mock_download_model = ensure_mocks['download_model']
 
     # Simulate first model missing
     mock_check_model_exists.return_value = False
@@ -203,8 +248,8 @@ def test_ensure_models_downloaded_download_fails(
     assert result_path is None
 
     # Assert: Correct functions called
-    mock_get_models_dir.assert_called_once()
-    mock_get_hf_token.assert_called_once()
+    ensure_mocks['get_models_dir'].assert_called_once()
+    ensure_mocks['_get_hf_token'].assert_called_once()
 
     # Assert: check_model_exists called for the first model (at least)
     mock_check_model_exists.assert_any_call(
@@ -212,96 +257,262 @@ def test_ensure_models_downloaded_download_fails(
         fake_models_path,
         fake_token
     )
-    # Assert check_model_exists was called for all models (since loop doesn't break)
+    # Assert check_model_exists was called for all models (checks all run before any download)
     num_models = len(model_downloader.REQUIRED_MODELS)
     assert mock_check_model_exists.call_count == num_models
 
-    # Assert: download_model called for the first model (at least)
-    mock_download_model.assert_any_call(
+    # Assert: download_model called for the first model only (fails fast)
+    mock_download_model.assert_called_once_with(
         model_downloader.REQUIRED_MODELS[0],
         fake_models_path,
         fake_token
     )
-    # Assert download_model was called for all models (since check returns False for all)
-    assert mock_download_model.call_count == num_models
+
+
+def test_ensure_models_downloaded_stops_after_first_failure(ensure_mocks: dict) -> None:
+    """Test downloads after the first failed one are never attempted."""
+    ensure_mocks['get_models_dir'].return_value = FAKE_MODELS_PATH
+    ensure_mocks['_get_hf_token'].return_value = None
+    ensure_mocks['check_model_exists'].return_value = False # Every model missing
+    # Only the first model fails; the others would succeed if attempted
+    failing_model = model_downloader.REQUIRED_MODELS[0]
+    ensure_mocks['download_model'].side_effect = lambda model_id, models_dir, token: model_id != failing_model
+
+    result_path = model_downloader.ensure_models_are_downloaded()
+
+    assert result_path is None
+    attempted = [c.args[0] for c in ensure_mocks['download_model'].call_args_list]
+    assert attempted == [failing_model]
+
+
+def test_ensure_models_skips_when_marker_fresh(ensure_mocks: dict,
+                                               tmp_path: pathlib.Path,
+                                               monkeypatch) -> None:
+    """Test ensure_models_are_downloaded trusts a recent .last_sync marker."""
+    ensure_mocks['get_models_dir'].return_value = tmp_path
+    (tmp_path / model_downloader.LAST_SYNC_MARKER).touch()
+
+    result_path = model_downloader.ensure_models_are_downloaded()
+
+    assert result_path == tmp_path
+    ensure_mocks['check_model_exists'].assert_not_called()
+    ensure_mocks['download_model'].assert_not_called()
+    ensure_mocks['_get_hf_token'].assert_not_called()
+
+
+@pytest.mark.parametrize("offline_value", ["1", "true", "ON"])
+def test_ensure_offline_skips_downloads(ensure_mocks: dict,
+                                        offline_value: str,
+                                        tmp_path: pathlib.Path,
+                                        monkeypatch) -> None:
+    """Test HF_HUB_OFFLINE still checks the local cache but never downloads."""
+    monkeypatch.setenv("HF_HUB_OFFLINE", offline_value)
+    ensure_mocks['get_models_dir'].return_value = tmp_path
+    ensure_mocks['check_model_exists'].return_value = True
+
+    result_path = model_downloader.ensure_models_are_downloaded()
+
+    assert result_path == tmp_path
+    assert ensure_mocks['check_model_exists'].call_count == len(model_downloader.REQUIRED_MODELS)
+    ensure_mocks['download_model'].assert_not_called()
+    ensure_mocks['snapshot_download'].assert_not_called()
+
+
+def test_ensure_offline_empty_cache_fails(tmp_path: pathlib.Path, monkeypatch) -> None:
+    """Test HF_HUB_OFFLINE with an empty models dir reports failure instead of success."""
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    with mock.patch.multiple(
+        'reverb_gui.utils.model_downloader',
+        get_models_dir=mock.Mock(return_value=tmp_path), # Real (empty) directory
+        download_model=mock.DEFAULT,
+    ) as mocks:
+        result_path = model_downloader.ensure_models_are_downloaded()
+
+    assert result_path is None
+    mocks['download_model'].assert_not_called()
+    # A failed check must not mark the cache as synced
+    assert not (tmp_path / model_downloader.LAST_SYNC_MARKER).exists()
+
+
+@pytest.mark.parametrize(
+    "marker_age, ttl_env",
+    [
+        (None, None),       # No marker yet
+        (2 * 86400, None),  # Marker older than the default one-day TTL
+        (60, "30"),         # Marker older than a custom TTL
+        (0, "0"),           # TTL of zero always re-checks
+    ]
+)
+def test_ensure_models_rechecks_when_marker_stale(ensure_mocks: dict,
+                                                  marker_age: int | None,
+                                                  ttl_env: str | None,
+                                                  tmp_path: pathlib.Path,
+                                                  monkeypatch) -> None:
+    """Test a missing or stale marker triggers a full check and is refreshed on success."""
+    if ttl_env is not None:
+        monkeypatch.setenv("REVERB_MODEL_TTL_SECONDS", ttl_env)
+    ensure_mocks['get_models_dir'].return_value = tmp_path
+    ensure_mocks['_get_hf_token'].return_value = None
+    ensure_mocks['check_model_exists'].return_value = True
+    marker = tmp_path / model_downloader.LAST_SYNC_MARKER
+    if marker_age is not None:
+        marker.touch()
+        stale_time = time.time() - marker_age
+        os.utime(marker, (stale_time, stale_time))
+
+    result_path = model_downloader.ensure_models_are_downloaded()
+
+    assert result_path == tmp_path
+    assert ensure_mocks['check_model_exists'].call_count == len(model_downloader.REQUIRED_MODELS)
+    # Marker is (re)written after the successful check
+    assert time.time() - marker.stat().st_mtime < 60
 
 
 # --- Tests for check_model_exists --- #
 
-@mock.patch('reverb_gui.utils.model_downloader.snapshot_download') # Corrected target
-def test_check_model_exists_success(mock_snapshot_download: mock.MagicMock) -> None:
-    """Test check_model_exists when the model is found locally."""
+@mock.patch('pathlib.Path.is_dir')
+@mock.patch('pathlib.Path.read_text')
+def test_check_model_exists_success(mock_read_text: mock.MagicMock, mock_is_dir: mock.MagicMock) -> None:
+    """Test check_model_exists when the snapshot for refs/main is present."""
     # Arrange
     test_model_id = "org/model-name"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
-    # No exception raised by mock means success
+    mock_read_text.return_value = "abc123\n" # Commit hash recorded for main
+    mock_is_dir.return_value = True
 
     # Act
     result = model_downloader.check_model_exists(test_model_id, fake_models_path, fake_token)
 
     # Assert
     assert result is True
-    mock_snapshot_download.assert_called_once_with(
-        repo_id=test_model_id,
-        cache_dir=fake_models_path,
-        local_files_only=True,
-        token=fake_token,
-        repo_type="model"
-    )
+    mock_read_text.assert_called_once_with()
+    mock_is_dir.assert_called_once_with()
 
-@mock.patch('reverb_gui.utils.model_downloader.snapshot_download') # Corrected target
-def test_check_model_exists_not_found(mock_snapshot_download: mock.MagicMock) -> None:
+@pytest.mark.parametrize(
+    "ref_result, is_dir",
+    [
+        (FileNotFoundError("refs/main"), False),  # Never downloaded: no ref
+        ("abc123", False),                        # Ref present but its snapshot is missing
+        ("", True),                               # Empty ref file
+    ]
+)
+@mock.patch('pathlib.Path.is_dir')
+@mock.patch('pathlib.Path.read_text')
+def test_check_model_exists_not_found(mock_read_text: mock.MagicMock,
+                                      mock_is_dir: mock.MagicMock,
+                                      ref_result: str | Exception,
+                                      is_dir: bool) -> None:
     """Test check_model_exists when the model is not found locally."""
     # Arrange
     test_model_id = "org/model-name"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
-    mock_snapshot_download.side_effect = LocalEntryNotFoundError("Model not found")
+    if isinstance(ref_result, Exception):
+        mock_read_text.side_effect = ref_result
+    else:
+        mock_read_text.return_value = ref_result
+    mock_is_dir.return_value = is_dir
 
     # Act
     result = model_downloader.check_model_exists(test_model_id, fake_models_path, fake_token)
 
     # Assert
     assert result is False
-    mock_snapshot_download.assert_called_once_with(
-        repo_id=test_model_id,
-        cache_dir=fake_models_path,
-        local_files_only=True,
-        token=fake_token,
-        repo_type="model"
-    )
+    mock_read_text.assert_called_once_with()
 
-@mock.patch('reverb_gui.utils.model_downloader.snapshot_download') # Corrected target
-def test_check_model_exists_other_error(mock_snapshot_download: mock.MagicMock) -> None:
+@mock.patch('pathlib.Path.read_text')
+def test_check_model_exists_other_error(mock_read_text: mock.MagicMock) -> None:
     """Test check_model_exists when some other error occurs during check."""
     # Arrange
     test_model_id = "org/model-name"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
-    mock_snapshot_download.side_effect = Exception("Some other error")
+    mock_read_text.side_effect = PermissionError("Access denied")
 
     # Act
     result = model_downloader.check_model_exists(test_model_id, fake_models_path, fake_token)
 
     # Assert
     assert result is False
-    mock_snapshot_download.assert_called_once_with(
-        repo_id=test_model_id,
-        cache_dir=fake_models_path,
-        local_files_only=True,
-        token=fake_token,
-        repo_type="model"
-    )
+    mock_read_text.assert_called_once_with()
+
+@mock.patch('pathlib.Path.read_text')
+def test_check_model_exists_unexpected_error_propagates(mock_read_text: mock.MagicMock) -> None:
+    """Test check_model_exists does not swallow errors unrelated to the filesystem."""
+    mock_read_text.side_effect = RuntimeError("Unexpected bug")
+
+    with pytest.raises(RuntimeError, match="Unexpected bug"):
+        model_downloader.check_model_exists("org/model-name", FAKE_MODELS_PATH, 'fake_token')
+
+def test_model_cache_subdirs_precomputed() -> None:
+    """Test every required model has its Hugging Face cache folder name precomputed."""
+    assert model_downloader._MODEL_CACHE_SUBDIRS == {
+        "Revai/reverb-asr": "models--Revai--reverb-asr",
+        "Revai/reverb-diarization-v2": "models--Revai--reverb-diarization-v2",
+    }
+
+def test_check_model_exists_cache_layout(tmp_path: pathlib.Path) -> None:
+    """Test check_model_exists against a real Hugging Face cache directory layout."""
+    model_cache_dir = tmp_path / "models--org--model-name"
+    (model_cache_dir / "snapshots" / "old456").mkdir(parents=True) # Stale revision only
+    assert model_downloader.check_model_exists("org/model-name", tmp_path, None) is False
+
+    (model_cache_dir / "refs").mkdir()
+    (model_cache_dir / "refs" / "main").write_text("abc123")
+    assert model_downloader.check_model_exists("org/model-name", tmp_path, None) is False
+
+    (model_cache_dir / "snapshots" / "abc123").mkdir()
+    assert model_downloader.check_model_exists("org/model-name", tmp_path, None) is True
+
+def test_check_model_exists_corrupt_ref(tmp_path: pathlib.Path) -> None:
+    """Test a refs/main that is not valid UTF-8 counts as missing rather than crashing."""
+    model_cache_dir = tmp_path / "models--org--model-name"
+    (model_cache_dir / "refs").mkdir(parents=True)
+    (model_cache_dir / "refs" / "main").write_bytes(b"\xff\xfe\x00garbage")
+
+    assert model_downloader.check_model_exists("org/model-name", tmp_path, None) is False
 
 # --- Tests for download_model --- #
 
+@pytest.mark.parametrize(
+    "installed, initial_env, expected_env",
+    [
+        (True, {}, "1"),                                  # Installed: enabled by default
+        (True, {"HF_HUB_ENABLE_HF_TRANSFER": "0"}, "0"), # Explicit user opt-out is kept
+        (False, {}, None),                                # Not installed: left disabled
+    ]
+)
+def test_download_model_enables_hf_transfer(installed: bool, initial_env: dict, expected_env: str | None) -> None:
+    """Test hf_transfer is switched on only when the package is available."""
+    environ = dict(initial_env)
+    fake_spec = mock.sentinel.spec if installed else None
+    with mock.patch('reverb_gui.utils.model_downloader.importlib.util.find_spec', return_value=fake_spec):
+        enabled = model_downloader._enable_hf_transfer(environ)
+
+    assert environ.get(model_downloader.ENV_HF_TRANSFER) == expected_env
+    assert enabled is (expected_env == "1")
+
+def test_hf_transfer_dotenv_opt_out(mock_load_dotenv: mock.MagicMock,
+                                    tmp_path: pathlib.Path,
+                                    monkeypatch) -> None:
+    """Test HF_HUB_ENABLE_HF_TRANSFER=0 in .env wins over the import-time default."""
+    env_file = tmp_path / ".env"
+    env_file.write_text("HF_HUB_ENABLE_HF_TRANSFER=0\n")
+    mock_load_dotenv.side_effect = lambda: dotenv.main.load_dotenv(env_file) # Real load of the fake .env
+    monkeypatch.delenv(model_downloader.ENV_HF_TRANSFER, raising=False) # Restored after the test
+
+    with mock.patch('importlib.util.find_spec', return_value=mock.sentinel.spec): # hf_transfer "installed"
+        importlib.reload(model_downloader)
+
+    assert os.environ[model_downloader.ENV_HF_TRANSFER] == "0"
+
 @mock.patch('reverb_gui.utils.model_downloader.snapshot_download')
 def test_download_model_success(mock_snapshot_download: mock.MagicMock) -> None:
     """Test download_model successful execution."""
     # Arrange
     test_model_id = "org/dl-model-success"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
     # No exception means success
 
@@ -316,7 +527,8 @@ def test_download_model_success(mock_snapshot_download: mock.MagicMock) -> None:
         resume_download=True,
         token=fake_token,
         repo_type="model",
-        ignore_patterns=None # Default when no specific patterns set
+        ignore_patterns=None, # Default when no specific patterns set
+        max_workers=8 # DEFAULT_DOWNLOAD_WORKERS
     )
 
 @mock.patch('reverb_gui.utils.model_downloader.snapshot_download')
@@ -324,7 +536,7 @@ def test_download_model_http_error(mock_snapshot_download: mock.MagicMock) -> No
     """Test download_model handling HfHubHTTPError."""
     # Arrange
     test_model_id = "org/dl-model-http-error"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
     # Configure the mock response
     mock_response = mock.Mock()
@@ -343,7 +555,8 @@ def test_download_model_http_error(mock_snapshot_download: mock.MagicMock) -> No
         resume_download=True,
         token=fake_token,
         repo_type="model",
-        ignore_patterns=None
+        ignore_patterns=None,
+        max_workers=8
     )
 
 @mock.patch('reverb_gui.utils.model_downloader.snapshot_download')
@@ -351,7 +564,7 @@ def test_download_model_other_error(mock_snapshot_download: mock.MagicMock) -> N
     """Test download_model handling generic Exception."""
     # Arrange
     test_model_id = "org/dl-model-other-error"
-    fake_models_path = pathlib.Path('C:/fake/models/dir')
+    fake_models_path = FAKE_MODELS_PATH
     fake_token = 'fake_token'
     mock_snapshot_download.side_effect = Exception("Unexpected error")
 
@@ -366,8 +579,33 @@ def test_download_model_other_error(mock_snapshot_download: mock.MagicMock) -> N
         resume_download=True,
         token=fake_token,
         repo_type="model",
-        ignore_patterns=None
+        ignore_patterns=None,
+        max_workers=8
     )
 
+@pytest.mark.parametrize(
+    "env_workers, expected_workers",
+    [
+        (None, 8),    # Unset: default
+        ("16", 16),   # Explicit value
+        ("1", 1),     # Serial download
+        ("0", 1),     # Clamped to at least one worker
+        ("many", 8),  # Invalid: falls back to default
+    ]
+)
+@mock.patch('reverb_gui.utils.model_downloader.snapshot_download')
+def test_download_model_max_workers_from_env(mock_snapshot_download: mock.MagicMock,
+                                             env_workers: str | None,
+                                             expected_workers: int,
+                                             monkeypatch) -> None:
+    """Test download_model passes REVERB_DOWNLOAD_WORKERS through as max_workers."""
+    if env_workers is not None:
+        monkeypatch.setenv("REVERB_DOWNLOAD_WORKERS", env_workers)
+
+    result = model_downloader.download_model("org/dl-model-workers", FAKE_MODELS_PATH, None)
+
+    assert result is True
+    assert mock_snapshot_download.call_args.kwargs["max_workers"] == expected_workers
+
 
 # End of tests for model_downloader.py
@@ -2,6 +2,7 @@ import os
 import pytest
 from pathlib import Path
 
+from reverb_gui.utils import path_parser
 from reverb_gui.utils.path_parser import parse_env_path
 
 # Define platform-specific expected outputs where needed
@@ -10,48 +11,79 @@ HOME_DIR = Path.home()
 
 # Test cases
 # Format: (input_raw_string, expected_path_string_or_none, test_env_vars)
-# expected_path_string uses os.sep for platform independence where appropriate
-TEST_CASES = [
+# expected_path_string is passed through os.path.normpath once, when TEST_CASES is built
+BASIC_CASES = [
     # --- Basic cases ---
     (None, None, {}),
     ("", None, {}),
     ("   ", None, {}),
     ("ffmpeg", "ffmpeg", {}),
-    ("/usr/bin/ffmpeg", os.path.normpath("/usr/bin/ffmpeg"), {}),
-    ("relative/path", os.path.normpath("relative/path"), {}),
+    ("/usr/bin/ffmpeg", "/usr/bin/ffmpeg", {}),
+    ("relative/path", "relative/path", {}),
     # --- Quoting ---
     ('"ffmpeg"', "ffmpeg", {}),
     ("'ffmpeg'", "ffmpeg", {}),
-    ('  "  /usr/bin/ffmpeg "  ', os.path.normpath("/usr/bin/ffmpeg"), {}),
+    ('  "  /usr/bin/ffmpeg "  ', "/usr/bin/ffmpeg", {}),
     ('""', None, {}),
     ("''", None, {}),
-    # --- Windows Paths ---
-    ("C:/ffmpeg/bin/ffmpeg.exe", os.path.normpath("C:/ffmpeg/bin/ffmpeg.exe"), {}),
-    ("C:\\ffmpeg\\bin\\ffmpeg.exe", os.path.normpath('C:\\ffmpeg\\bin\\ffmpeg.exe'), {}),
+    # --- Windows-style paths (parsed the same on every platform) ---
+    ("C:/ffmpeg/bin/ffmpeg.exe", "C:/ffmpeg/bin/ffmpeg.exe", {}),
+    ("C:\\ffmpeg\\bin\\ffmpeg.exe", 'C:\\ffmpeg\\bin\\ffmpeg.exe', {}),
     # Test the problematic case directly (raw string in env)
-    ('C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe', os.path.normpath('C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe'), {}),
+    ('C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe', 'C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe', {}),
     # With quotes
-    ('"C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe"', os.path.normpath('C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe'), {}),
-    # Mixed slashes
-    ("C:/Program Files\\ffmpeg/bin\\ffmpeg.exe", os.path.normpath('C:/Program Files\\ffmpeg/bin/ffmpeg.exe'), {}),
+    ('"C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe"', 'C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe', {}),
     # --- Escape Sequences ---
-    (r'C:\Users\test\t\n\r', os.path.normpath(r'C:\Users\test\t\n\r'), {}), # Raw string input -> escapes decoded
+    (r'C:\Users\test\t\n\r', r'C:\Users\test\t\n\r', {}), # Raw string input -> escapes decoded
+]
+
+# Cases relying on Windows separator handling or %VAR% expansion
+WINDOWS_CASES = [
+    # Mixed slashes (only normalized to one separator on Windows)
+    ("C:/Program Files\\ffmpeg/bin\\ffmpeg.exe", 'C:/Program Files\\ffmpeg/bin/ffmpeg.exe', {}),
+    ("%USERPROFILE%\\Documents", f"{os.environ.get('USERPROFILE', HOME_DIR)}\\Documents", {}),
+]
+
+EXPANSION_CASES = [
     # --- Expansion ---
-    ("~/myapp/data.txt", os.path.normpath(f"{HOME_DIR}/myapp/data.txt"), {}),
-    ("$MY_APP_VAR/data", os.path.normpath("/test/app/path/data"), {"MY_APP_VAR": "/test/app/path"}),
-    ("~/$OTHER_VAR/log", os.path.normpath(f"{HOME_DIR}/other_dir/log"), {"OTHER_VAR": "other_dir"}),
-    # Windows-specific expansion
-    ("%USERPROFILE%\\Documents", os.path.normpath(f"{os.environ.get('USERPROFILE', HOME_DIR)}\\Documents") if IS_WINDOWS else None, {}),
-    ("$UNDEFINED_VAR/path", os.path.normpath("$UNDEFINED_VAR/path"), {}), # Undefined vars are left as-is
+    ("~/myapp/data.txt", f"{HOME_DIR}/myapp/data.txt", {}),
+    ("$MY_APP_VAR/data", "/test/app/path/data", {"MY_APP_VAR": "/test/app/path"}),
+    ("~/$OTHER_VAR/log", f"{HOME_DIR}/other_dir/log", {"OTHER_VAR": "other_dir"}),
+    ("$UNDEFINED_VAR/path", "$UNDEFINED_VAR/path", {}), # Undefined vars are left as-is
 ]
 
+def _case_id(raw):
+    """Short, stable test ID: the raw input itself, or a slug for None/empty/blank."""
+    if raw is None:
+        return "none"
+    if not raw:
+        return "empty"
+    return raw if raw.strip() else "blank"
+
+def _params(cases, marks=()):
+    """Wraps cases in pytest.param, normalizing expectations and deriving IDs from the raw input."""
+    return [
+        pytest.param(raw, None if expected is None else os.path.normpath(expected), env,
+                     id=_case_id(raw), marks=marks)
+        for raw, expected, env in cases
+    ]
+
+TEST_CASES = (
+    _params(BASIC_CASES)
+    + _params(WINDOWS_CASES, marks=pytest.mark.skipif(not IS_WINDOWS, reason="Windows path semantics"))
+    + _params(EXPANSION_CASES)
+)
+
+@pytest.fixture(autouse=True)
+def clear_unquote_cache():
+    """Start every test with an empty quote-stripping cache."""
+    path_parser._unquote.cache_clear()
+    yield
+    path_parser._unquote.cache_clear()
+
 @pytest.mark.parametrize("raw_input, expected_str, test_env", TEST_CASES)
 def test_parse_env_path(monkeypatch, raw_input, expected_str, test_env):
     """Verify parse_env_path handles various inputs correctly."""
-    # Skip Windows-specific tests on non-Windows platforms
-    if not IS_WINDOWS and os.environ.get('USERPROFILE') and expected_str is None and raw_input and '%USERPROFILE%' in raw_input:
-        pytest.skip("Skipping Windows USERPROFILE test on non-Windows platform")
-
     # Set environment variables for the test
     for key, value in test_env.items():
         monkeypatch.setenv(key, value)
@@ -80,3 +112,18 @@ def test_parse_env_path_problematic_backslash():
     result = parse_env_path(raw)
     assert result is not None
     assert str(result) == expected
+
+def test_parse_env_path_cache_respects_env_changes(monkeypatch):
+    """Cached stripping must not freeze variable expansion for a repeated input."""
+    monkeypatch.setenv("MY_APP_VAR", "/first")
+    assert str(parse_env_path('"$MY_APP_VAR/data"')) == os.path.normpath("/first/data")
+
+    monkeypatch.setenv("MY_APP_VAR", "/second")
+    assert str(parse_env_path('"$MY_APP_VAR/data"')) == os.path.normpath("/second/data")
+    assert path_parser._unquote.cache_info().hits == 1
+
+@pytest.mark.parametrize("raw_input", [None, "", "   ", '""', "''", '  ""  '])
+def test_parse_env_path_blank_skips_parsing(raw_input):
+    """Blank or empty-quoted inputs return None without entering the parser."""
+    assert parse_env_path(raw_input) is None
+    assert path_parser._unquote.cache_info().misses == 0